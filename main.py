@@ -1,8 +1,10 @@
 import os
-from src.utils.experiment_runner import run_experiments
-from src.utils.results_visualization import visualize_results 
 
 def main():
+    # Imported here so that importing this module stays cheap (matplotlib is slow to load)
+    from src.utils.experiment_runner import run_experiments
+    from src.utils.results_visualization import visualize_results
+
     # Create directories if they don't exist
     if not os.path.exists('graphs'):
         os.makedirs('graphs')
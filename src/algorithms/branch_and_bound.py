@@ -0,0 +1,190 @@
+import time
+
+from src.algorithms.greedy_heuristic import greedy_dominating_set
+from src.utils.csr_graph import as_csr
+from src.utils.instrumentation import current
+
+# Slack used when comparing a node's bound with the incumbent, so float
+# rounding in the bound never prunes a strictly better solution
+EPSILON = 1e-9
+# Search nodes between two checks of the time budget, for a 1-vertex graph;
+# nodes cost O(n), so the interval shrinks as n grows
+DEADLINE_CHECK_INTERVAL = 256
+
+
+class _SearchState:
+    """Bitmask encoding of a graph plus the incumbent and search counters."""
+
+    def __init__(self, graph):
+        n = graph.number_of_nodes()
+        self.n = n
+        self.weights = graph.weights.tolist()
+        self.closed_masks = []
+        self.dominators = []
+        for v in range(n):
+            closed = graph.closed_neighborhood(v).tolist()
+            mask = 0
+            for u in closed:
+                mask |= 1 << u
+            self.closed_masks.append(mask)
+            # N[u] is symmetric, so u's dominators are exactly its closed neighborhood
+            self.dominators.append(closed)
+        self.full_mask = (1 << n) - 1
+        self.best_weight = float('inf')
+        self.best_set = None
+        self.nodes_explored = 0
+        self.nodes_pruned = 0
+        # Hook for callers sharing the incumbent across searches (e.g. workers)
+        self.external_bound = None
+        self.on_improvement = None
+        self.deadline = None
+        self.check_interval = max(1, DEADLINE_CHECK_INTERVAL // max(n, 1))
+        # Polled along with the deadline; returning True stops the search the same way
+        self.interrupt = None
+
+    def should_prune(self, value):
+        if value >= self.best_weight - EPSILON:
+            return True
+        # Ties with an external incumbent are kept, so the caller can break
+        # them the same way a single serial search would
+        return self.external_bound is not None and value > self.external_bound() + EPSILON
+
+    def offer(self, chosen, weight):
+        if weight < self.best_weight:
+            self.best_weight = weight
+            self.best_set = list(chosen)
+            if self.on_improvement is not None:
+                self.on_improvement(self.best_set, weight)
+
+
+def _lower_bound(state, undominated, allowed):
+    """
+    Returns (bound, branching vertex, its candidate dominators ordered by
+    cost-effectiveness), or None if some undominated vertex can no longer be
+    dominated.
+
+    The bound charges every undominated vertex the cheapest share it could
+    pay, min over allowed dominators v of w(v) / |N[v] & undominated|, and is
+    combined with the weight of the most expensive single vertex to cover.
+    """
+    weights = state.weights
+    closed_masks = state.closed_masks
+    ratios = {}
+    share_sum = 0.0
+    single_max = 0.0
+    branch_vertex = None
+    branch_candidates = None
+    remaining = undominated
+    while remaining:
+        low = remaining & -remaining
+        u = low.bit_length() - 1
+        remaining ^= low
+        best_share = float('inf')
+        cheapest = float('inf')
+        candidates = []
+        for v in state.dominators[u]:
+            if not (allowed >> v) & 1:
+                continue
+            ratio = ratios.get(v)
+            if ratio is None:
+                ratio = weights[v] / (closed_masks[v] & undominated).bit_count()
+                ratios[v] = ratio
+            candidates.append(v)
+            if ratio < best_share:
+                best_share = ratio
+            if weights[v] < cheapest:
+                cheapest = weights[v]
+        if not candidates:
+            return None
+        share_sum += best_share
+        if cheapest > single_max:
+            single_max = cheapest
+        # Fail-first: branch on the vertex with the fewest ways to be dominated
+        if branch_candidates is None or len(candidates) < len(branch_candidates):
+            branch_vertex = u
+            branch_candidates = candidates
+    branch_candidates.sort(key=lambda v: (ratios[v], v))
+    return max(share_sum, single_max), branch_vertex, branch_candidates
+
+
+def _search(state, undominated, allowed, chosen, chosen_weight):
+    state.nodes_explored += 1
+    if not state.nodes_explored % state.check_interval and (
+            (state.deadline is not None and time.time() > state.deadline)
+            or (state.interrupt is not None and state.interrupt())):
+        raise TimeoutError("Exact search exceeded its time budget")
+    if not undominated:
+        state.offer(chosen, chosen_weight)
+        return
+    result = _lower_bound(state, undominated, allowed)
+    if result is None or state.should_prune(chosen_weight + result[0]):
+        state.nodes_pruned += 1
+        return
+    _, _, candidates = result
+    for v in candidates:
+        chosen.append(v)
+        _search(state, undominated & ~state.closed_masks[v], allowed & ~(1 << v),
+                chosen, chosen_weight + state.weights[v])
+        chosen.pop()
+        # Later siblings never use v, so each subset is explored at most once
+        allowed &= ~(1 << v)
+
+
+def _initial_solution(graph):
+    """Greedy solution with redundant vertices dropped, heaviest first."""
+    greedy_set, _, _, _ = greedy_dominating_set(graph)
+    chosen = sorted((graph.index_of(v) for v in greedy_set),
+                    key=lambda v: -graph.weights[v])
+    coverage = [0] * graph.number_of_nodes()
+    for v in chosen:
+        for u in graph.closed_neighborhood(v).tolist():
+            coverage[u] += 1
+    solution = []
+    for v in chosen:
+        closed = graph.closed_neighborhood(v).tolist()
+        if all(coverage[u] > 1 for u in closed):
+            for u in closed:
+                coverage[u] -= 1
+        else:
+            solution.append(v)
+    return solution
+
+
+def branch_and_bound_search(G, weights=None, max_time=None):
+    """
+    Exact MWDS by depth-first branch and bound over bitmask coverage.
+
+    Each node picks the undominated vertex with the fewest remaining
+    dominators and branches on which of them dominates it, excluding earlier
+    siblings. The incumbent starts from the greedy solution and nodes whose
+    lower bound cannot beat it are pruned.
+
+    Returns the same tuple as `exhaustive_search`: (set, weight, nodes
+    explored, time in ms, nodes pruned). Raises TimeoutError if `max_time`
+    (ms) runs out before optimality is proven.
+    """
+    graph = as_csr(G, weights)
+    metrics = current()
+    start_time = time.time()
+    with metrics.phase('branch_and_bound.setup'):
+        state = _SearchState(graph)
+    if max_time is not None:
+        state.deadline = start_time + max_time / 1000
+    if state.n:
+        with metrics.phase('branch_and_bound.initial_solution'):
+            initial = _initial_solution(graph)
+        state.offer(initial, sum(state.weights[v] for v in sorted(initial)))
+        try:
+            with metrics.phase('branch_and_bound.search'):
+                _search(state, state.full_mask, state.full_mask, [], 0.0)
+        finally:
+            metrics.count('branch_and_bound.nodes_explored', state.nodes_explored)
+            metrics.count('branch_and_bound.nodes_pruned', state.nodes_pruned)
+    best_set, best_weight = None, float('inf')
+    if state.best_set is not None:
+        best_set = sorted(state.best_set)
+        best_weight = sum(state.weights[v] for v in best_set)
+        best_set = tuple(graph.to_labels(best_set))
+    end_time = time.time()
+    execution_time = end_time - start_time
+    return best_set, best_weight, state.nodes_explored, execution_time * 1000, state.nodes_pruned
@@ -0,0 +1,294 @@
+import time
+
+from src.algorithms.greedy_heuristic import greedy_dominating_set
+from src.utils.csr_graph import CSRGraph
+
+# Smallest weight decrease accepted as an improving swap
+EPSILON = 1e-12
+# Event kinds accepted by DynamicDominatingSet.apply, with their argument count
+EVENTS = {
+    'add_edge': 2,
+    'remove_edge': 2,
+    'set_weight': 2,
+    'add_node': 2,
+    'remove_node': 1
+}
+
+
+class DynamicDominatingSet:
+    """
+    Dominating set kept up to date while the graph changes.
+
+    Holds the graph as adjacency sets keyed by node label, the node weights,
+    the current solution D and cov(u) = |N[u] & D| for every node. Updates
+    arrive in batches of events (see `apply`); after a batch the solution is
+    repaired only around the touched nodes:
+    - nodes left with cov = 0 are re-dominated greedily, each by the
+      neighbor with the best weight per newly dominated node;
+    - solution nodes near the change whose whole closed neighborhood has
+      cov >= 2 are dropped, heaviest first;
+    - around re-priced nodes, add-then-drop swaps (as in `local_search`) are
+      tried and kept when the total weight decreases.
+    Work per batch is proportional to the 2-hop neighborhoods of the touched
+    nodes, never to |V|.
+    """
+
+    def __init__(self, G, weights=None, solution=None):
+        """
+        Starts from a NetworkX graph or CSRGraph. `weights` maps node ->
+        weight (default: the 'weight' node attribute, or the CSRGraph
+        weights). Without a `solution`, the greedy one is used.
+        """
+        if isinstance(G, CSRGraph):
+            labels = G.labels
+            self.adjacency = {labels[v]: set(G.to_labels(G.neighbors(v).tolist())) for v in range(len(labels))}
+            if weights is None:
+                weights = dict(zip(labels, G.weights.tolist()))
+        else:
+            self.adjacency = {v: set(G.neighbors(v)) - {v} for v in G.nodes()}
+            if weights is None:
+                weights = dict(G.nodes(data='weight'))
+        self.weights = {v: float(weights[v]) for v in self.adjacency}
+        if solution is None:
+            solution, _, _, _ = greedy_dominating_set(self.to_csr())
+        self.solution = set()
+        self.coverage = dict.fromkeys(self.adjacency, 0)
+        self.total_weight = 0.0
+        for v in solution:
+            self._add(v)
+        self.stats = {'batches': 0, 'events': 0, 'added': 0, 'dropped': 0, 'swaps': 0}
+        # Nodes never left undominated, even if the given solution was partial
+        self._repair([v for v in self.adjacency if not self.coverage[v]], ())
+
+    def to_csr(self):
+        """Snapshot of the current graph as a CSRGraph (labels kept), e.g. to run a static solver."""
+        labels = list(self.adjacency)
+        index = {v: i for i, v in enumerate(labels)}
+        sources = [index[v] for v in labels for u in self.adjacency[v]]
+        targets = [index[u] for v in labels for u in self.adjacency[v]]
+        return CSRGraph.from_edges(len(labels), sources, targets,
+                                   [self.weights[v] for v in labels], labels)
+
+    def closed_neighborhood(self, v):
+        return self.adjacency[v] | {v}
+
+    def _add(self, v):
+        self.solution.add(v)
+        self.total_weight += self.weights[v]
+        self.coverage[v] += 1
+        for u in self.adjacency[v]:
+            self.coverage[u] += 1
+
+    def _drop(self, v):
+        self.solution.discard(v)
+        self.total_weight -= self.weights[v]
+        self.coverage[v] -= 1
+        for u in self.adjacency[v]:
+            self.coverage[u] -= 1
+
+    def _redundant(self, v):
+        if self.coverage[v] < 2:
+            return False
+        return all(self.coverage[u] >= 2 for u in self.adjacency[v])
+
+    def _nearby_solution(self, v):
+        """Solution nodes within two hops of v."""
+        found = set()
+        for u in self.closed_neighborhood(v):
+            for x in self.closed_neighborhood(u):
+                if x in self.solution:
+                    found.add(x)
+        return found
+
+    def _try_swap(self, x):
+        """Adds x and drops the nodes it makes redundant; undone unless the weight decreases."""
+        self._add(x)
+        dropped = []
+        gain = -self.weights[x]
+        for v in sorted(self._nearby_solution(x) - {x}, key=lambda v: -self.weights[v]):
+            if self._redundant(v):
+                self._drop(v)
+                dropped.append(v)
+                gain += self.weights[v]
+        if gain > EPSILON:
+            self.stats['swaps'] += 1
+            self.stats['dropped'] += len(dropped)
+            return True
+        for v in dropped:
+            self._add(v)
+        self._drop(x)
+        return False
+
+    def _repair(self, touched, repriced):
+        # Re-dominate the touched nodes left without a dominator
+        undominated = {v for v in touched if v in self.adjacency and not self.coverage[v]}
+        added = []
+        while undominated:
+            x = min(undominated, key=lambda v: (len(self.adjacency[v]), repr(v)))
+
+            def cost(u):
+                gained = sum(1 for y in self.closed_neighborhood(u) if y in undominated)
+                return self.weights[u] / gained, repr(u)
+
+            u = min(self.closed_neighborhood(x), key=cost)
+            self._add(u)
+            added.append(u)
+            self.stats['added'] += 1
+            undominated -= self.closed_neighborhood(u)
+
+        # Prune redundant solution nodes around the changes, heaviest first
+        candidates = set()
+        for v in list(touched) + added:
+            if v in self.adjacency:
+                candidates |= self._nearby_solution(v)
+        for v in sorted(candidates, key=lambda v: (-self.weights[v], repr(v))):
+            if self._redundant(v):
+                self._drop(v)
+                self.stats['dropped'] += 1
+
+        # Try to profit from re-priced nodes
+        for v in repriced:
+            if v not in self.adjacency:
+                continue
+            for x in sorted(self.closed_neighborhood(v), key=repr):
+                if x not in self.solution:
+                    self._try_swap(x)
+
+    def apply(self, events):
+        """
+        Applies a batch of events, then repairs the solution once. Each event
+        is a tuple (or list) starting with its kind:
+        ('add_edge', u, v), ('remove_edge', u, v), ('set_weight', v, weight),
+        ('add_node', v, weight) and ('remove_node', v).
+        The whole batch is checked first (see `_check_batch`), so an invalid
+        event raises ValueError before anything changes.
+        Returns the time taken in ms.
+        """
+        start_time = time.time()
+        events = [tuple(event) for event in events]
+        self._check_batch(events)
+        touched = set()
+        repriced = set()
+        try:
+            for kind, *args in events:
+                getattr(self, '_' + kind)(touched, repriced, *args)
+                self.stats['events'] += 1
+        finally:
+            # Whatever was applied is repaired, so the solution always dominates
+            self._repair(touched, repriced)
+        self.stats['batches'] += 1
+        end_time = time.time()
+        return (end_time - start_time) * 1000
+
+    def _check_batch(self, events):
+        """Raises ValueError unless every event is well formed and names nodes that exist when it runs."""
+        added = set()
+        removed = set()
+
+        def exists(v):
+            return v not in removed and (v in added or v in self.adjacency)
+
+        for event in events:
+            if not event or EVENTS.get(event[0]) != len(event) - 1:
+                raise ValueError(f"Invalid event: {event!r}")
+            kind, *args = event
+            if kind == 'add_node':
+                if exists(args[0]):
+                    raise ValueError(f"Node {args[0]!r} already exists")
+                added.add(args[0])
+                removed.discard(args[0])
+            else:
+                nodes = args if kind in ('add_edge', 'remove_edge') else args[:1]
+                missing = [v for v in nodes if not exists(v)]
+                if missing:
+                    raise ValueError(f"Unknown node {missing[0]!r} in event {event!r}")
+                if kind == 'remove_node':
+                    removed.add(args[0])
+                    added.discard(args[0])
+            if kind in ('set_weight', 'add_node'):
+                try:
+                    float(args[1])
+                except (TypeError, ValueError):
+                    raise ValueError(f"Invalid weight in event {event!r}") from None
+
+    def _add_edge(self, touched, repriced, u, v):
+        if u == v or v in self.adjacency[u]:
+            return
+        self.adjacency[u].add(v)
+        self.adjacency[v].add(u)
+        if u in self.solution:
+            self.coverage[v] += 1
+        if v in self.solution:
+            self.coverage[u] += 1
+        touched.update((u, v))
+
+    def _remove_edge(self, touched, repriced, u, v):
+        if v not in self.adjacency[u]:
+            return
+        self.adjacency[u].discard(v)
+        self.adjacency[v].discard(u)
+        if u in self.solution:
+            self.coverage[v] -= 1
+        if v in self.solution:
+            self.coverage[u] -= 1
+        touched.update((u, v))
+
+    def _set_weight(self, touched, repriced, v, weight):
+        weight = float(weight)
+        if v in self.solution:
+            self.total_weight += weight - self.weights[v]
+        self.weights[v] = weight
+        touched.add(v)
+        repriced.add(v)
+
+    def _add_node(self, touched, repriced, v, weight):
+        if v in self.adjacency:
+            raise ValueError(f"Node {v!r} already exists")
+        self.adjacency[v] = set()
+        self.weights[v] = float(weight)
+        self.coverage[v] = 0
+        touched.add(v)
+
+    def _remove_node(self, touched, repriced, v):
+        for u in list(self.adjacency[v]):
+            self._remove_edge(touched, repriced, u, v)
+        if v in self.solution:
+            self._drop(v)
+        del self.adjacency[v]
+        del self.weights[v]
+        del self.coverage[v]
+        touched.discard(v)
+        repriced.discard(v)
+
+    def is_dominating(self):
+        """Full O(|V| + |E|) check of the current solution, for testing."""
+        return all(self.closed_neighborhood(v) & self.solution for v in self.adjacency)
+
+    def to_dict(self):
+        """JSON-serializable state (node labels must be JSON values)."""
+        index = {v: i for i, v in enumerate(self.adjacency)}
+        return {
+            'nodes': [[v, self.weights[v]] for v in self.adjacency],
+            'edges': [[u, v] for u in self.adjacency for v in self.adjacency[u] if index[u] < index[v]],
+            'solution': list(self.solution),
+            'stats': dict(self.stats)
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        """Restores an object saved with `to_dict`."""
+        self = cls.__new__(cls)
+        self.adjacency = {v: set() for v, _ in state['nodes']}
+        self.weights = {v: float(weight) for v, weight in state['nodes']}
+        for u, v in state['edges']:
+            self.adjacency[u].add(v)
+            self.adjacency[v].add(u)
+        self.solution = set()
+        self.coverage = dict.fromkeys(self.adjacency, 0)
+        self.total_weight = 0.0
+        for v in state['solution']:
+            self._add(v)
+        self.stats = dict(state.get('stats', {}))
+        for key in ('batches', 'events', 'added', 'dropped', 'swaps'):
+            self.stats.setdefault(key, 0)
+        return self
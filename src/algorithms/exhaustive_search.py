@@ -1,16 +1,64 @@
 import itertools
 import time
+import numpy as np
+
+from src.algorithms.branch_and_bound import branch_and_bound_search
+from src.algorithms.gray_code_search import gray_code_search
+from src.algorithms.parallel_exhaustive import parallel_exhaustive_search
+from src.algorithms.reduction import solve_components
+from src.utils.csr_graph import CSRGraph, as_csr
+from src.utils.instrumentation import current
 
 def is_dominating_set(G, D):
+    if isinstance(G, CSRGraph):
+        dominated = np.zeros(G.number_of_nodes(), dtype=bool)
+        for v in D:
+            dominated[G.closed_neighborhood(v)] = True
+        return bool(dominated.all())
     dominated = set(D)
     for v in D:
         dominated.update(G.neighbors(v))
-    return dominated == set(G.nodes())
+    # Only nodes of G can be dominated, so equal sizes mean equal sets
+    return len(dominated) == G.number_of_nodes()
+
+def exhaustive_search(G, weights=None, method='branch_and_bound', reduce=False, **options):
+    """
+    Exact minimum weight dominating set.
+
+    `method` selects the engine: 'branch_and_bound' (default, see
+    `branch_and_bound_search`), 'parallel' (see `parallel_exhaustive_search`),
+    'enumerate', which tests every subset in order of size, or 'gray', which
+    tests every subset with bitmasks in Gray-code order (see
+    `gray_code_search`) and returns the same set as 'enumerate'. `options` go
+    to the selected engine. All return (set, weight, configurations tested,
+    time in ms, basic operations); for branch and bound the configurations
+    are search nodes and the basic operations are pruned nodes, for 'gray'
+    they are subsets checked and coverage updates.
 
-def exhaustive_search(G, weights):
+    With `reduce=True` the graph is first shrunk by `reduce_graph` and each
+    remaining component is searched on its own; configurations and basic
+    operations are then summed over the components.
+    """
+    if reduce:
+        solution, min_weight, execution_time, results = solve_components(
+            G, weights, exhaustive_search, method=method, **options)
+        # Vertex order, like the labels returned by every engine
+        solution = sorted(solution, key=as_csr(G, weights).index_of)
+        return (tuple(solution), min_weight, sum(result[2] for result in results),
+                execution_time, sum(result[4] for result in results))
+    if method == 'branch_and_bound':
+        return branch_and_bound_search(G, weights, **options)
+    if method == 'parallel':
+        return parallel_exhaustive_search(G, weights, **options)
+    if method == 'gray':
+        return gray_code_search(G, weights, **options)
+    if method != 'enumerate':
+        raise ValueError(f"Unknown exhaustive search method: {method}")
+    graph = as_csr(G, weights)
+    w = graph.weights.tolist()
     min_weight = float('inf')
     min_dominating_set = None
-    nodes = list(G.nodes())
+    nodes = list(graph.nodes())
     total_configs_tested = 0
     start_time = time.time()
     num_basic_operations = 0
@@ -18,11 +66,14 @@ def exhaustive_search(G, weights):
         for subset in itertools.combinations(nodes, r):
             total_configs_tested += 1
             num_basic_operations += 1
-            if is_dominating_set(G, subset):
-                weight = sum(weights[v] for v in subset)
+            if is_dominating_set(graph, subset):
+                weight = sum(w[v] for v in subset)
                 if weight < min_weight:
                     min_weight = weight
                     min_dominating_set = subset
     end_time = time.time()
     execution_time = end_time - start_time
+    current().count('enumerate.subsets_tested', total_configs_tested)
+    if min_dominating_set is not None:
+        min_dominating_set = tuple(graph.to_labels(min_dominating_set))
     return min_dominating_set, min_weight, total_configs_tested, execution_time * 1000, num_basic_operations
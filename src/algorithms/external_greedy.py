@@ -0,0 +1,211 @@
+import json
+import os
+import time
+import numpy as np
+
+from src.utils.instrumentation import current
+from src.utils.read_graph import _cache_dir, _temp_path, _vertex_weights, _write_json, load_edge_arrays
+
+# Edges streamed per chunk (int64, so 32 MB per array)
+EDGE_CHUNK = 1 << 22
+ADJACENCY_VERSION = 1
+
+
+def _adjacency_paths(file_path):
+    cache_dir = _cache_dir(file_path)
+    return (os.path.join(cache_dir, "adjacency.json"),
+            os.path.join(cache_dir, "adjacency_indptr.npy"),
+            os.path.join(cache_dir, "adjacency_indices.npy"))
+
+
+def _source_digest(file_path):
+    with open(os.path.join(_cache_dir(file_path), "meta.json"), 'r') as file:
+        return json.load(file)["sha1"]
+
+
+def _edge_chunks(sources, targets, chunk_edges):
+    for start in range(0, len(sources), chunk_edges):
+        yield np.asarray(sources[start:start + chunk_edges]), np.asarray(targets[start:start + chunk_edges])
+
+
+def _row_blocks(indptr, chunk_edges):
+    """Vertex ranges [start, stop) holding at most `chunk_edges` entries (or a single vertex)."""
+    n = len(indptr) - 1
+    start = 0
+    while start < n:
+        stop = int(np.searchsorted(indptr, indptr[start] + chunk_edges, side='right')) - 1
+        stop = min(max(stop, start + 1), n)
+        yield start, stop
+        start = stop
+
+
+def build_external_adjacency(file_path, chunk_edges=EDGE_CHUNK):
+    """
+    Writes the undirected adjacency of a graph file as an on-disk CSR
+    (`adjacency_indptr.npy` / `adjacency_indices.npy` in `<file>.cache`),
+    holding only O(|V|) arrays and one chunk of edges in memory:
+    1. degrees are counted over the memory-mapped edge arrays of
+       `load_edge_arrays`, chunk by chunk;
+    2. every edge is scattered into both endpoint rows of a memory-mapped
+       indices file (a counting sort);
+    3. rows are sorted and deduplicated block by block into the final file.
+    Returns (indptr, indices), both memory-mapped read-only.
+    """
+    header, sources, targets, _ = load_edge_arrays(file_path, use_cache=True)
+    n = header["num_vertices"]
+    meta_path, indptr_path, indices_path = _adjacency_paths(file_path)
+    # Unique scratch names, moved into place at the end, so concurrent builds do not collide
+    cache_dir = os.path.dirname(indices_path)
+    scratch_path = _temp_path(cache_dir, ".npy")
+    final_path = _temp_path(cache_dir, ".npy")
+
+    degree = np.zeros(n, dtype=np.int64)
+    for chunk_sources, chunk_targets in _edge_chunks(sources, targets, chunk_edges):
+        degree += np.bincount(chunk_sources, minlength=n)
+        degree += np.bincount(chunk_targets, minlength=n)
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(degree, out=indptr[1:])
+
+    scratch = np.lib.format.open_memmap(scratch_path, mode='w+', dtype=np.int32,
+                                        shape=(max(int(indptr[-1]), 1),))
+    cursor = indptr[:-1].copy()
+    for chunk_sources, chunk_targets in _edge_chunks(sources, targets, chunk_edges):
+        rows = np.concatenate((chunk_sources, chunk_targets))
+        cols = np.concatenate((chunk_targets, chunk_sources))
+        order = np.argsort(rows, kind='stable')
+        rows, cols = rows[order], cols[order]
+        # Position of each entry within its row's share of this chunk
+        first = np.searchsorted(rows, rows, side='left')
+        positions = cursor[rows] + np.arange(len(rows)) - first
+        scratch[positions] = cols
+        cursor += np.bincount(rows, minlength=n)
+
+    # Deduplicate rows (repeated and reversed edges) into the final file
+    final = np.lib.format.open_memmap(final_path, mode='w+', dtype=np.int32,
+                                      shape=(max(int(indptr[-1]), 1),))
+    unique_degree = np.zeros(n, dtype=np.int64)
+    count = 0
+    for start, stop in _row_blocks(indptr, chunk_edges):
+        segment = np.asarray(scratch[indptr[start]:indptr[stop]], dtype=np.int64)
+        rows = np.repeat(np.arange(start, stop), degree[start:stop])
+        keys = np.unique(rows * n + segment)
+        final[count:count + len(keys)] = keys % n
+        unique_degree[start:stop] = np.bincount(keys // n - start, minlength=stop - start)
+        count += len(keys)
+    final.flush()
+    del final, scratch
+    os.remove(scratch_path)
+    os.replace(final_path, indices_path)
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(unique_degree, out=indptr[1:])
+    indptr_temp = _temp_path(cache_dir, ".npy")
+    np.save(indptr_temp, indptr)
+    os.replace(indptr_temp, indptr_path)
+    _write_json(meta_path, {"version": ADJACENCY_VERSION, "sha1": _source_digest(file_path),
+                            "num_vertices": n, "num_entries": count})
+    return load_external_adjacency(file_path)
+
+
+def load_external_adjacency(file_path):
+    """Memory-maps the on-disk CSR of `file_path`, building it first if missing or stale."""
+    meta_path, indptr_path, indices_path = _adjacency_paths(file_path)
+    load_edge_arrays(file_path, use_cache=True)  # Refreshes the edge sidecar if the file changed
+    if os.path.exists(meta_path):
+        with open(meta_path, 'r') as file:
+            meta = json.load(file)
+        if meta.get("version") == ADJACENCY_VERSION and meta["sha1"] == _source_digest(file_path):
+            indptr = np.load(indptr_path, mmap_mode='r')
+            indices = np.load(indices_path, mmap_mode='r')[:meta["num_entries"]]
+            return indptr, indices
+    return build_external_adjacency(file_path)
+
+
+def external_greedy(file_path, weights=None, epsilon=0.1, chunk_edges=EDGE_CHUNK):
+    """
+    Semi-external greedy MWDS for graphs whose edges do not fit in memory.
+
+    Only O(|V|) state stays in memory: weights, dominated/chosen flags, the
+    row pointers and an upper bound on each vertex's gain (undominated
+    vertices of the closed neighbourhood N[v]; gains only shrink). The adjacency is streamed from the
+    memory-mapped on-disk CSR (see `build_external_adjacency`) in passes
+    over blocks of at most `chunk_edges` entries.
+
+    Each pass has a threshold tau: a vertex whose score w(v) / gain(v) is
+    at most tau when its row is read is taken at once. Rows whose bound
+    w(v) / gain bound already exceeds tau are not read at all. After a pass
+    every remaining score exceeds tau, so tau grows by a factor (1 + epsilon)
+    (or jumps to the smallest score seen), every pick is within (1 + epsilon)
+    of the smallest w(v) / gain(v) at that point and the number of passes is
+    logarithmic in the ratio of the largest to the smallest score. This is
+    the greedy for closed-neighbourhood gains, not `greedy_dominating_set`,
+    whose w(v) / (d(v) + 1) score also takes vertices that dominate nothing
+    new, so its weights are not comparable (see the README).
+
+    `weights` is an array indexed by vertex (default: the weights of
+    `read_graph`). Returns (set, weight, time in ms, rows read, pass stats),
+    where each pass reports its threshold, rows and bytes read, blocks
+    with a candidate, vertices chosen, vertices left undominated and time.
+    """
+    metrics = current()
+    start_time = time.time()
+    with metrics.phase('external_greedy.adjacency'):
+        indptr, indices = load_external_adjacency(file_path)
+    n = len(indptr) - 1
+    if weights is None:
+        weights = np.fromiter(_vertex_weights(n).values(), dtype=np.float64, count=n)
+    w = np.asarray(weights, dtype=np.float64)
+    indptr = np.asarray(indptr)
+    blocks = list(_row_blocks(indptr, chunk_edges))
+    gain_bound = np.diff(indptr) + 1
+    dominated = np.zeros(n, dtype=bool)
+    chosen = np.zeros(n, dtype=bool)
+    undominated = n
+    threshold = float((w / gain_bound).min()) if n else 0.0
+    passes = []
+    rows_read = 0
+
+    while undominated:
+        pass_start = time.time()
+        stats = {'threshold': threshold, 'rows_read': 0, 'bytes_read': 0, 'blocks_read': 0, 'chosen': 0}
+        next_threshold = float('inf')
+        for start, stop in blocks:
+            with np.errstate(divide='ignore'):
+                bounds = w[start:stop] / gain_bound[start:stop]
+            selectable = bounds <= threshold
+            if not selectable.all():
+                next_threshold = min(next_threshold, float(bounds[~selectable].min()))
+            candidates = np.flatnonzero(selectable) + start
+            if not len(candidates):
+                continue
+            stats['blocks_read'] += 1
+            stats['rows_read'] += len(candidates)
+            for v in candidates.tolist():
+                # Only candidate rows are read; the rest of the block stays on disk
+                row = np.asarray(indices[indptr[v]:indptr[v + 1]])
+                stats['bytes_read'] += row.nbytes
+                open_rows = row[~dominated[row]]
+                gain = len(open_rows) + (not dominated[v])
+                if gain and w[v] / gain <= threshold:
+                    chosen[v] = True
+                    dominated[open_rows] = True
+                    dominated[v] = True
+                    undominated -= gain
+                    stats['chosen'] += 1
+                    gain = 0
+                elif gain:
+                    next_threshold = min(next_threshold, w[v] / gain)
+                gain_bound[v] = gain
+        rows_read += stats['rows_read']
+        stats['undominated'] = undominated
+        stats['time_ms'] = (time.time() - pass_start) * 1000
+        passes.append(stats)
+        threshold = max(threshold * (1 + epsilon), next_threshold)
+
+    metrics.count('external_greedy.passes', len(passes))
+    metrics.count('external_greedy.rows_read', rows_read)
+    metrics.count('external_greedy.bytes_read', sum(stats['bytes_read'] for stats in passes))
+    D = np.flatnonzero(chosen).tolist()
+    total_weight = sum(w[v] for v in D)
+    end_time = time.time()
+    execution_time = end_time - start_time
+    return set(D), total_weight, execution_time * 1000, rows_read, passes
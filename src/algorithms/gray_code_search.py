@@ -0,0 +1,122 @@
+import time
+import numpy as np
+
+from src.utils.csr_graph import as_csr
+from src.utils.instrumentation import current
+
+# Vertices handled by the vectorized inner block (2^BLOCK_BITS subsets per block)
+BLOCK_BITS = 16
+# Coverage is kept in uint64 bitmasks
+MAX_VERTICES = 64
+
+
+def _low_tables(masks, weights):
+    """Coverage mask and weight of every subset of the low vertices, indexed by subset bits."""
+    cover = np.zeros(1, dtype=np.uint64)
+    weight = np.zeros(1)
+    for mask, w in zip(masks, weights):
+        cover = np.concatenate((cover, cover | np.uint64(mask)))
+        weight = np.concatenate((weight, weight + w))
+    return cover, weight
+
+
+def gray_code_search(G, weights=None, block_bits=BLOCK_BITS):
+    """
+    Exact MWDS by enumerating every subset, like method='enumerate', but with
+    closed neighborhoods as 64-bit masks.
+
+    The vertices are split into `block_bits` low vertices and the remaining
+    high ones. High subsets are visited in Gray-code order, so each step adds
+    or removes a single vertex and updates per-vertex coverage counts (and
+    the high coverage mask) incrementally. For each high subset, all low
+    subsets are checked at once with precomputed coverage/weight tables:
+    `low_cover | high_cover == full`. Blocks whose high part is already too
+    heavy, or that cannot be completed by any low subset, are skipped.
+
+    Candidates close to the best weight are re-summed in vertex order, so the
+    result is the one `enumerate` returns: the minimum by (weight, size,
+    lexicographic order). Returns (set, weight, subsets checked, time in ms,
+    coverage updates).
+    """
+    graph = as_csr(G, weights)
+    metrics = current()
+    start_time = time.time()
+    n = graph.number_of_nodes()
+    if n > MAX_VERTICES:
+        raise ValueError(f"method='gray' supports up to {MAX_VERTICES} vertices, got {n}")
+    w = graph.weights.tolist()
+    closed = [graph.closed_neighborhood(v).tolist() for v in range(n)]
+    masks = [sum(1 << u for u in neighborhood) for neighborhood in closed]
+    full = (1 << n) - 1
+    low = min(block_bits, n)
+    high_vertices = list(range(low, n))
+    with metrics.phase('gray.setup'):
+        low_cover, low_weight = _low_tables(masks[:low], w[:low])
+        low_union = 0
+        for mask in masks[:low]:
+            low_union |= mask
+    # Slack for float rounding between the table sums and the vertex-order sums
+    tolerance = 1e-9 * max(sum(w), 1.0)
+
+    best_key = None
+    best_set = None
+    subsets_checked = 0
+    coverage_updates = 0
+    count = [0] * n
+    high_cover = 0
+    high_weight = 0.0
+    chosen_high = set()
+
+    def exact_key(low_bits, high_set):
+        subset = [v for v in range(low) if (low_bits >> v) & 1] + sorted(high_set)
+        # Same summation order as method='enumerate'
+        return sum(w[v] for v in subset), len(subset), tuple(subset)
+
+    with metrics.phase('gray.search'):
+        for step in range(1 << len(high_vertices)):
+            if step:
+                # Gray code: step i flips the bit of its lowest set bit
+                bit = (step & -step).bit_length() - 1
+                v = high_vertices[bit]
+                coverage_updates += 1
+                if v in chosen_high:
+                    chosen_high.discard(v)
+                    high_weight -= w[v]
+                    for u in closed[v]:
+                        count[u] -= 1
+                        if not count[u]:
+                            high_cover &= ~(1 << u)
+                else:
+                    chosen_high.add(v)
+                    high_weight += w[v]
+                    for u in closed[v]:
+                        if not count[u]:
+                            high_cover |= 1 << u
+                        count[u] += 1
+            if best_key is not None and high_weight > best_key[0] + tolerance:
+                continue
+            if (high_cover | low_union) != full:
+                continue
+            subsets_checked += len(low_cover)
+            dominating = (low_cover | np.uint64(high_cover)) == np.uint64(full)
+            if not chosen_high:
+                dominating[0] = False  # The empty set is never a candidate
+            candidates = np.flatnonzero(dominating)
+            if not len(candidates):
+                continue
+            totals = low_weight[candidates] + high_weight
+            limit = totals.min() if best_key is None else min(totals.min(), best_key[0])
+            for low_bits in candidates[totals <= limit + tolerance].tolist():
+                key = exact_key(low_bits, chosen_high)
+                if best_key is None or key < best_key:
+                    best_key = key
+    metrics.count('gray.subsets_checked', subsets_checked)
+    metrics.count('gray.coverage_updates', coverage_updates)
+
+    min_weight = float('inf')
+    if best_key is not None:
+        min_weight, _, best_set = best_key
+        best_set = tuple(graph.to_labels(best_set))
+    end_time = time.time()
+    execution_time = end_time - start_time
+    return best_set, min_weight, subsets_checked, execution_time * 1000, coverage_updates
@@ -1,25 +1,78 @@
+import heapq
 import time
+import numpy as np
 
-def greedy_dominating_set(G, weights):
+from src.algorithms.local_search import local_search
+from src.utils.csr_graph import as_csr
+from src.utils.instrumentation import current
+
+# Heap pops between two checks of `max_time`
+TIME_CHECK_INTERVAL = 256
+
+def greedy_dominating_set(G, weights=None, local_search_time=None, max_time=None):
+    """
+    Picks the vertex minimizing w(v) / (d(v) + 1), where d(v) is its number of
+    undominated neighbors, until every vertex is dominated.
+
+    d(v) is kept per vertex and only decremented around each newly dominated
+    vertex (its 2-hop neighborhood). Scores can only grow, so a lazy heap
+    suffices: a popped entry whose score is stale is pushed back with the
+    current score, and the first up-to-date entry popped is the true minimum.
+    Ties go to the lowest vertex index.
+
+    With `max_time` (ms) the greedy stops when the time runs out and every
+    vertex still undominated gets its cheapest dominator (see
+    `CSRGraph.cheapest_dominators`), so the result is always a dominating set.
+    With `local_search_time` (ms) the result is refined by `local_search`.
+    """
+    graph = as_csr(G, weights)
+    metrics = current()
     start_time = time.time()
-    D = set()
-    dominated = set()
-    nodes = set(G.nodes())
+    deadline = None if max_time is None else start_time + max_time / 1000
+    n = graph.number_of_nodes()
+    w = graph.weights.tolist()
+    undominated_neighbors = graph.degree().astype(np.int64)
+    dominated = np.zeros(n, dtype=bool)
+    in_D = bytearray(n)
+    D = []
+    remaining = n
+    with metrics.phase('greedy.setup'):
+        heap = list(zip((graph.weights / (undominated_neighbors + 1)).tolist(), range(n)))
+        heapq.heapify(heap)
     num_basic_operations = 0
-    while dominated != nodes:
-        best_vertex = None
-        best_value = float('inf')
-        for v in nodes - D:
-            undominated_neighbors = set(G.neighbors(v)) - dominated
-            value = weights[v] / (len(undominated_neighbors) + 1)
-            if value < best_value:
-                best_value = value
-                best_vertex = v
-            num_basic_operations += 1  # Counting the for loop iterations 
-        D.add(best_vertex)
-        dominated.update([best_vertex])
-        dominated.update(G.neighbors(best_vertex))
-    total_weight = sum(weights[v] for v in D)
+    with metrics.phase('greedy.search'):
+        while remaining:
+            if (deadline is not None and not num_basic_operations % TIME_CHECK_INTERVAL
+                    and time.time() > deadline):
+                # Out of time: finish with the cheapest dominator of each vertex left
+                completion = np.unique(graph.cheapest_dominators(np.flatnonzero(~dominated)))
+                D.extend(v for v in completion.tolist() if not in_D[v])
+                metrics.count('greedy.completed_on_timeout', len(completion))
+                break
+            value, v = heapq.heappop(heap)
+            num_basic_operations += 1  # Counting the candidates evaluated
+            if in_D[v]:
+                continue
+            score = w[v] / (int(undominated_neighbors[v]) + 1)
+            if value != score:
+                heapq.heappush(heap, (score, v))
+                continue
+            D.append(v)
+            in_D[v] = 1
+            closed = graph.closed_neighborhood(v)
+            newly_dominated = closed[~dominated[closed]]
+            if len(newly_dominated):
+                dominated[newly_dominated] = True
+                remaining -= len(newly_dominated)
+                touched, _ = graph.gather(newly_dominated)
+                np.subtract.at(undominated_neighbors, touched, 1)
+    metrics.count('greedy.candidates_evaluated', num_basic_operations)
+    metrics.count('greedy.vertices_chosen', len(D))
+    total_weight = sum(w[v] for v in D)
+    D = set(graph.to_labels(D))
+    if local_search_time is not None:
+        D, total_weight, _, moves = local_search(graph, None, D, local_search_time)
+        num_basic_operations += moves
     end_time = time.time()
     execution_time = end_time - start_time
     return D, total_weight, execution_time * 1000, num_basic_operations
@@ -0,0 +1,75 @@
+import time
+import numpy as np
+
+from src.utils.csr_graph import as_csr
+from src.utils.instrumentation import current
+
+
+def lagrangian_lower_bound(G, weights=None, upper_bound=None, max_iterations=300, max_time=1000,
+                           interrupt=None):
+    """
+    Lower bound on the minimum dominating set weight, from the Lagrangian
+    relaxation of the covering constraints sum_{v in N[u]} x_v >= 1:
+
+        L(lam) = sum_u lam_u + sum_v min(0, w_v - sum_{u in N[v]} lam_u)
+
+    L(lam) <= OPT for every lam >= 0. The multipliers start from the dual
+    feasible point lam_u = min_{v in N[u]} w_v / |N[v]| and are improved by
+    subgradient steps with a Polyak step size towards `upper_bound` (a known
+    solution weight, e.g. the greedy one). Only sparse products with the
+    closed-neighborhood matrix are needed, so no LP/ILP solver is involved.
+
+    Stops after `max_iterations` steps, `max_time` ms or as soon as
+    `interrupt()` returns True. Returns (bound, time in ms, iterations).
+    """
+    graph = as_csr(G, weights)
+    start_time = time.time()
+    deadline = start_time + max_time / 1000
+    n = graph.number_of_nodes()
+    if n == 0:
+        return 0.0, 0.0, 0
+    w = graph.weights
+    closed_indices = graph.closed_indices
+    starts = graph.closed_indptr[:-1]
+    sizes = np.diff(graph.closed_indptr)
+
+    def neighborhood_sum(values):
+        # Closed neighborhoods are never empty, so reduceat has no empty segments
+        return np.add.reduceat(values[closed_indices], starts)
+
+    multipliers = np.minimum.reduceat((w / sizes)[closed_indices], starts)
+    best_bound = float(multipliers.sum())
+    if upper_bound is None:
+        upper_bound = float(w.sum())
+    step_scale = 2.0
+    stall = 0
+    iterations = 0
+    while iterations < max_iterations and time.time() < deadline:
+        if interrupt is not None and interrupt():
+            break
+        iterations += 1
+        reduced_costs = w - neighborhood_sum(multipliers)
+        x = reduced_costs < 0
+        bound = float(multipliers.sum() + reduced_costs[x].sum())
+        if bound > best_bound + 1e-12:
+            best_bound = bound
+            stall = 0
+        else:
+            stall += 1
+            if stall >= 20:
+                step_scale /= 2
+                stall = 0
+                if step_scale < 1e-4:
+                    break
+        subgradient = 1.0 - neighborhood_sum(x.astype(np.float64))
+        # Multipliers already at zero cannot move further down
+        subgradient[(multipliers <= 0) & (subgradient < 0)] = 0.0
+        norm = float(subgradient @ subgradient)
+        if norm == 0.0 or best_bound >= upper_bound:
+            break
+        step = step_scale * (upper_bound - bound) / norm
+        multipliers = np.maximum(0.0, multipliers + step * subgradient)
+    current().count('lower_bound.iterations', iterations)
+    end_time = time.time()
+    execution_time = end_time - start_time
+    return min(best_bound, upper_bound), execution_time * 1000, iterations
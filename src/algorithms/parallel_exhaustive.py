@@ -0,0 +1,179 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from src.algorithms.branch_and_bound import _SearchState, _initial_solution, _lower_bound, _search
+from src.utils.csr_graph import as_csr
+
+# Per-process search state, set up once by the pool initializer
+_worker = {}
+
+
+def _init_worker(graph, shared_best, lock):
+    state = _SearchState(graph)
+    state.external_bound = lambda: shared_best.value
+
+    def publish(_, weight):
+        with lock:
+            if weight < shared_best.value:
+                shared_best.value = weight
+
+    state.on_improvement = publish
+    _worker['state'] = state
+
+
+def _solve_task(task):
+    index, undominated, allowed, chosen, chosen_weight = task
+    state = _worker['state']
+    state.best_weight = float('inf')
+    state.best_set = None
+    state.nodes_explored = 0
+    state.nodes_pruned = 0
+    _search(state, undominated, allowed, list(chosen), chosen_weight)
+    return index, state.best_set, state.best_weight, state.nodes_explored, state.nodes_pruned
+
+
+def _expand_frontier(state, target):
+    """
+    Splits the search tree into independent subtrees by expanding it level by
+    level until there are at least `target` of them. Nodes keep the order in
+    which a serial depth-first search would visit them.
+    """
+    closed_masks = state.closed_masks
+    weights = state.weights
+    frontier = [(state.full_mask, state.full_mask, (), 0.0)]
+    while len(frontier) < target:
+        next_frontier = []
+        expanded = False
+        for node in frontier:
+            undominated, allowed, chosen, chosen_weight = node
+            if not undominated:
+                next_frontier.append(node)
+                continue
+            state.nodes_explored += 1
+            result = _lower_bound(state, undominated, allowed)
+            if result is None or state.should_prune(chosen_weight + result[0]):
+                state.nodes_pruned += 1
+                continue
+            expanded = True
+            for v in result[2]:
+                next_frontier.append((undominated & ~closed_masks[v], allowed & ~(1 << v),
+                                      chosen + (v,), chosen_weight + weights[v]))
+                allowed &= ~(1 << v)
+        frontier = next_frontier
+        if not expanded:
+            break
+    return frontier
+
+
+def _fingerprint(graph):
+    digest = hashlib.sha1()
+    for array in (graph.indptr, graph.indices, graph.weights):
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+def _load_checkpoint(path, fingerprint):
+    """Returns the checkpoint saved for this graph, or None."""
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, 'r') as file:
+        checkpoint = json.load(file)
+    if checkpoint.get('fingerprint') != fingerprint:
+        return None
+    return checkpoint
+
+
+def _completed_tasks(checkpoint, path, num_tasks):
+    if checkpoint is None:
+        return {}
+    if checkpoint.get('num_tasks') != num_tasks:
+        raise ValueError(f"Checkpoint {path} splits the search into {checkpoint.get('num_tasks')} "
+                         f"tasks, not {num_tasks}; remove it to start over")
+    return {int(index): tuple(entry) for index, entry in checkpoint['completed'].items()}
+
+
+def _write_checkpoint(path, fingerprint, target, num_tasks, completed):
+    checkpoint = {
+        'fingerprint': fingerprint,
+        'target': target,
+        'num_tasks': num_tasks,
+        'completed': {str(index): list(entry) for index, entry in completed.items()}
+    }
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as file:
+        json.dump(checkpoint, file)
+    os.replace(tmp_path, path)
+
+
+def parallel_exhaustive_search(G, weights=None, max_workers=None, tasks_per_worker=8,
+                               checkpoint_path=None, checkpoint_interval=30.0):
+    """
+    Branch and bound spread over a process pool.
+
+    The top of the search tree is expanded into independent subtrees that
+    workers solve with the serial search, pruning against a shared best-known
+    weight. Ties are broken by the serial visiting order, so the returned set
+    is the one `branch_and_bound_search` finds.
+
+    With `checkpoint_path` set, finished subtrees are written to a JSON file
+    at most every `checkpoint_interval` seconds (and at the end); rerunning on
+    the same graph skips them. The split only depends on the graph and the
+    number of subtrees asked for, so a resumed run reuses the checkpoint's
+    split whatever `max_workers` and `tasks_per_worker` are now.
+
+    Returns the same tuple as `exhaustive_search`.
+    """
+    graph = as_csr(G, weights)
+    start_time = time.time()
+    max_workers = max_workers or os.cpu_count() or 1
+    state = _SearchState(graph)
+    if not state.n:
+        return None, float('inf'), 0, (time.time() - start_time) * 1000, 0
+
+    initial = _initial_solution(graph)
+    state.offer(initial, sum(state.weights[v] for v in sorted(initial)))
+    # Candidates are (weight, visiting order, set); the greedy incumbent comes first
+    candidates = [(state.best_weight, -1, state.best_set)]
+    fingerprint = _fingerprint(graph)
+    checkpoint = _load_checkpoint(checkpoint_path, fingerprint)
+    target = checkpoint.get('target') if checkpoint else max_workers * tasks_per_worker
+    tasks = _expand_frontier(state, target)
+    nodes_explored = state.nodes_explored
+    nodes_pruned = state.nodes_pruned
+    completed = _completed_tasks(checkpoint, checkpoint_path, len(tasks))
+    shared_best = multiprocessing.RawValue('d', state.best_weight)
+    for best_set, best_weight, _, _ in completed.values():
+        if best_set is not None and best_weight < shared_best.value:
+            shared_best.value = best_weight
+    pending = [(index,) + task for index, task in enumerate(tasks) if index not in completed]
+
+    if pending:
+        lock = multiprocessing.Lock()
+        last_checkpoint = time.time()
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(graph, shared_best, lock)) as executor:
+            futures = [executor.submit(_solve_task, task) for task in pending]
+            for future in as_completed(futures):
+                index, best_set, best_weight, explored, pruned = future.result()
+                completed[index] = (best_set, best_weight, explored, pruned)
+                if checkpoint_path and time.time() - last_checkpoint >= checkpoint_interval:
+                    _write_checkpoint(checkpoint_path, fingerprint, target, len(tasks), completed)
+                    last_checkpoint = time.time()
+    if checkpoint_path:
+        _write_checkpoint(checkpoint_path, fingerprint, target, len(tasks), completed)
+
+    for index, (best_set, best_weight, explored, pruned) in completed.items():
+        nodes_explored += explored
+        nodes_pruned += pruned
+        if best_set is not None:
+            candidates.append((best_weight, index, best_set))
+    _, _, best_set = min(candidates, key=lambda candidate: candidate[:2])
+    best_set = sorted(best_set)
+    best_weight = sum(state.weights[v] for v in best_set)
+    end_time = time.time()
+    execution_time = end_time - start_time
+    return tuple(graph.to_labels(best_set)), best_weight, nodes_explored, execution_time * 1000, nodes_pruned
@@ -0,0 +1,100 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from src.algorithms.randomized_search import _run_trials
+from src.utils.csr_graph import CSRGraph, as_csr
+
+# Arrays a worker needs to rebuild the graph, in CSRGraph argument order
+_GRAPH_ARRAYS = ('indptr', 'indices', 'weights', 'closed_indptr', 'closed_indices')
+
+# Per-process state, set up once by the pool initializer
+_worker = {}
+
+
+def _share_graph(graph):
+    """Copies the graph arrays into shared memory blocks; returns blocks and specs."""
+    blocks = []
+    specs = []
+    for name in _GRAPH_ARRAYS:
+        array = getattr(graph, name)
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[:] = array
+        blocks.append(block)
+        specs.append((block.name, array.shape, array.dtype.str))
+    return blocks, specs
+
+
+def _init_worker(specs, shared_best, lock):
+    blocks = [shared_memory.SharedMemory(name=name) for name, _, _ in specs]
+    arrays = [np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+              for block, (_, shape, dtype) in zip(blocks, specs)]
+    indptr, indices, weights, closed_indptr, closed_indices = arrays
+    _worker['blocks'] = blocks
+    _worker['graph'] = CSRGraph(indptr, indices, weights, None, closed_indptr, closed_indices)
+    _worker['shared_best'] = shared_best
+    _worker['lock'] = lock
+
+
+def _publish(_, weight):
+    shared_best = _worker['shared_best']
+    with _worker['lock']:
+        if weight < shared_best.value:
+            shared_best.value = weight
+
+
+def _worker_trials(index, seed_sequence, num_trials, deadline, batch_size):
+    shared_best = _worker['shared_best']
+    rng = np.random.default_rng(seed_sequence)
+    best_solution, best_weight, trials_done, num_basic_operations = _run_trials(
+        _worker['graph'], rng, num_trials, deadline, batch_size,
+        external_bound=lambda: shared_best.value, on_improvement=_publish)
+    return index, best_solution, best_weight, trials_done, num_basic_operations
+
+
+def parallel_randomized_mwds(graph, weights=None, max_iterations=1000, max_time=100, seed=None,
+                             max_workers=None, batch_size=None):
+    """
+    `randomized_mwds` with its trials spread over worker processes.
+
+    The graph arrays are placed in shared memory once and every worker maps
+    them. Worker i runs its share of the trials with its own stream spawned
+    from `seed`, and drops trials that are already worse than the best weight
+    any worker has found. Ties go to the lowest worker, so for a given seed
+    and worker count the result does not depend on scheduling (unless the
+    `max_time` budget, in milliseconds, cuts the run short).
+    """
+    graph = as_csr(graph, weights)
+    start_time = time.time()
+    deadline = start_time + max_time / 1000
+    max_workers = max_workers or os.cpu_count() or 1
+    streams = np.random.SeedSequence(seed).spawn(max_workers)
+    shares = [max_iterations // max_workers + (i < max_iterations % max_workers)
+              for i in range(max_workers)]
+
+    blocks, specs = _share_graph(graph)
+    try:
+        shared_best = multiprocessing.RawValue('d', float('inf'))
+        lock = multiprocessing.Lock()
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(specs, shared_best, lock)) as executor:
+            futures = [executor.submit(_worker_trials, i, streams[i], shares[i], deadline, batch_size)
+                       for i in range(max_workers) if shares[i]]
+            results = [future.result() for future in futures]
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+    num_basic_operations = sum(result[4] for result in results)
+    finished = [result for result in results if result[1]]
+    best_solution, best_weight = [], float('inf')
+    if finished:
+        _, best_solution, best_weight, _, _ = min(finished, key=lambda result: (result[2], result[0]))
+    end_time = time.time()
+    execution_time = end_time - start_time
+    return set(graph.to_labels(best_solution)), best_weight, execution_time * 1000, num_basic_operations
@@ -0,0 +1,239 @@
+import multiprocessing
+import os
+import queue
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from src.algorithms.branch_and_bound import _SearchState, _search
+from src.algorithms.greedy_heuristic import greedy_dominating_set
+from src.algorithms.local_search import local_search
+from src.algorithms.lower_bound import lagrangian_lower_bound
+from src.algorithms.randomized_search import _run_trials
+from src.utils.csr_graph import as_csr
+
+# Largest graph handed to the exact solver (its bitmasks grow with n)
+EXACT_MAX_VERTICES = 1000
+# Randomized trials per chunk, so workers notice an early stop
+TRIALS_PER_CHUNK = 256
+# Trials x vertices per randomized batch; the deadline is checked between batches
+BATCH_CELLS = 1 << 20
+# Fraction of the solution dropped before each local search restart
+PERTURBATION = 0.1
+# Longest single local search call (ms), so workers notice an early stop
+LOCAL_SEARCH_SLICE = 500
+# Time left after the greedy (ms) below which worker processes do not pay
+# off: they take tens of ms to start and, on a busy machine, longer to stop
+MIN_POOL_DEADLINE = 400
+# Share of the deadline the initial greedy may use
+GREEDY_SHARE = 0.5
+# Time kept back for stopping the workers and collecting their results:
+# this share of the deadline, capped at MAX_SHUTDOWN_MARGIN ms
+SHUTDOWN_SHARE = 0.25
+MAX_SHUTDOWN_MARGIN = 150
+# Workers started when `max_workers` is not given, on machines with fewer CPUs
+MIN_DEFAULT_WORKERS = 4
+# Relative slack when comparing a lower bound with the incumbent weight
+PROOF_TOLERANCE = 1e-9
+
+# Per-process state, set up once by the pool initializer
+_worker = {}
+
+
+def _init_worker(graph, improvements, shared_best, lock, stop, deadline):
+    _worker['graph'] = graph
+    _worker['improvements'] = improvements
+    _worker['shared_best'] = shared_best
+    _worker['lock'] = lock
+    _worker['stop'] = stop
+    _worker['deadline'] = deadline
+
+
+def _publish(source, vertices, weight):
+    """Reports a solution (vertex indices) if it beats the shared incumbent."""
+    shared_best = _worker['shared_best']
+    with _worker['lock']:
+        if weight >= shared_best.value:
+            return
+        shared_best.value = weight
+    _worker['improvements'].put((source, _worker['graph'].to_labels(vertices), weight))
+
+
+def _running():
+    return not _worker['stop'].is_set() and time.time() < _worker['deadline']
+
+
+# Every task returns a lower bound on the optimum (0 when it proves nothing)
+
+def _exact_task():
+    """Branch and bound sharing the incumbent; proves optimality if it finishes."""
+    graph = _worker['graph']
+    shared_best = _worker['shared_best']
+    state = _SearchState(graph)
+    state.external_bound = lambda: shared_best.value
+    state.on_improvement = lambda chosen, weight: _publish('exact', sorted(chosen), weight)
+    state.deadline = _worker['deadline']
+    state.interrupt = _worker['stop'].is_set
+    try:
+        _search(state, state.full_mask, state.full_mask, [], 0.0)
+    except TimeoutError:
+        return 0.0
+    # Every pruned node was no better than some incumbent, so the best one is optimal
+    return float('inf')
+
+
+def _lower_bound_task():
+    shared_best = _worker['shared_best']
+    remaining = (_worker['deadline'] - time.time()) * 1000
+    bound, _, _ = lagrangian_lower_bound(_worker['graph'], upper_bound=shared_best.value,
+                                         max_time=remaining, interrupt=_worker['stop'].is_set)
+    return bound
+
+
+def _randomized_task(seed_sequence):
+    graph = _worker['graph']
+    shared_best = _worker['shared_best']
+    rng = np.random.default_rng(seed_sequence)
+    batch_size = max(1, BATCH_CELLS // graph.number_of_nodes())
+    while _running():
+        _run_trials(graph, rng, TRIALS_PER_CHUNK, _worker['deadline'], batch_size,
+                    external_bound=lambda: shared_best.value, interrupt=lambda: not _running(),
+                    on_improvement=lambda solution, weight: _publish('randomized', solution, weight))
+    return 0.0
+
+
+def _local_search_task(initial, seed_sequence):
+    """
+    Iterated local search: drop a random part of the best solution and
+    repair it. `initial` and the solutions kept here are vertex indices;
+    they are turned into labels only for the `local_search` calls.
+    """
+    graph = _worker['graph']
+    rng = np.random.default_rng(seed_sequence)
+    best, best_weight = list(initial), float('inf')
+    start = best
+    while _running():
+        budget = min((_worker['deadline'] - time.time()) * 1000, LOCAL_SEARCH_SLICE)
+        solution, weight, execution_time, _ = local_search(graph, None, graph.to_labels(start), budget)
+        solution = sorted(graph.index_of(v) for v in solution)
+        if weight <= best_weight:
+            best, best_weight = solution, weight
+            _publish('local_search', best, weight)
+        if execution_time >= budget:
+            # Cut short before a local optimum: carry on from where it stopped
+            start = solution
+            continue
+        keep = rng.random(len(best)) >= PERTURBATION
+        start = [v for v, kept in zip(best, keep) if kept]
+    return 0.0
+
+
+def solve(graph, weights=None, deadline_ms=1000, on_improvement=None, max_workers=None, seed=None,
+          exact_max_vertices=EXACT_MAX_VERTICES):
+    """
+    Best dominating set found within `deadline_ms`, whatever the graph size.
+
+    The greedy solution is computed first, in this process, within
+    GREEDY_SHARE of the deadline (see `greedy_dominating_set`'s `max_time`).
+    If less than MIN_POOL_DEADLINE ms is left, only a local search follows.
+    Otherwise worker processes run until shortly before the deadline (a
+    SHUTDOWN_SHARE margin, at most MAX_SHUTDOWN_MARGIN ms, is kept for
+    stopping them):
+    - the exact branch and bound (graphs of up to `exact_max_vertices`);
+    - iterated local search starting from the greedy solution;
+    - the Lagrangian lower bound;
+    - randomized trials (every remaining worker, with streams spawned from
+      `seed`).
+    At most `max_workers` processes run (default: one per CPU, at least
+    MIN_DEFAULT_WORKERS so every kind of task runs). With fewer workers,
+    local search and the lower bound are kept first, then the exact search,
+    and randomized trials only get the workers left over.
+    They share the incumbent weight, so the exact search prunes with the
+    heuristics' solutions and randomized trials stop early. Every
+    improvement is passed to `on_improvement(set, weight, elapsed ms,
+    source)` as it arrives. If the exact search finishes, or the lower bound
+    meets the incumbent, the incumbent is optimal and the call returns
+    before the deadline.
+
+    Returns (set, weight, time in ms, optimal, history), where history lists
+    the (elapsed ms, weight, source) of every improvement.
+    """
+    graph = as_csr(graph, weights)
+    start_time = time.time()
+    deadline = start_time + deadline_ms / 1000
+    history = []
+    best = {'solution': set(), 'weight': float('inf')}
+
+    def improve(solution, weight, source):
+        if weight >= best['weight']:
+            return
+        best['solution'], best['weight'] = set(solution), weight
+        elapsed = (time.time() - start_time) * 1000
+        history.append((elapsed, weight, source))
+        if on_improvement is not None:
+            on_improvement(set(solution), weight, elapsed, source)
+
+    n = graph.number_of_nodes()
+    if n == 0:
+        return set(), 0.0, (time.time() - start_time) * 1000, True, history
+    greedy_set, greedy_weight, _, _ = greedy_dominating_set(graph, max_time=deadline_ms * GREEDY_SHARE)
+    improve(greedy_set, greedy_weight, 'greedy')
+    optimal = False
+
+    remaining = (deadline - time.time()) * 1000
+    if remaining < MIN_POOL_DEADLINE:
+        if remaining > 0:
+            solution, weight, _, _ = local_search(graph, None, greedy_set, remaining)
+            improve(solution, weight, 'local_search')
+    else:
+        slots = max_workers or max(os.cpu_count() or 1, MIN_DEFAULT_WORKERS)
+        streams = np.random.SeedSequence(seed).spawn(slots)
+        initial = sorted(graph.index_of(v) for v in greedy_set)
+        # By priority: with fewer slots the later tasks are left out
+        tasks = [(_local_search_task, (initial, streams[0])), (_lower_bound_task, ())]
+        if n <= exact_max_vertices:
+            tasks.append((_exact_task, ()))
+        tasks = tasks[:slots]
+        # The remaining workers run randomized trials
+        tasks += [(_randomized_task, (stream,)) for stream in streams[len(tasks):]]
+        stop_time = deadline - min(deadline_ms * SHUTDOWN_SHARE, MAX_SHUTDOWN_MARGIN) / 1000
+        improvements = multiprocessing.Queue()
+        shared_best = multiprocessing.RawValue('d', best['weight'])
+        lock = multiprocessing.Lock()
+        stop = multiprocessing.Event()
+        with ProcessPoolExecutor(max_workers=len(tasks), initializer=_init_worker,
+                                 initargs=(graph, improvements, shared_best, lock, stop, stop_time)) as executor:
+            futures = [executor.submit(task, *args) for task, args in tasks]
+
+            def proven():
+                bounds = [future.result() for future in futures
+                          if future.done() and future.exception() is None]
+                return max(bounds, default=0.0) >= best['weight'] * (1 - PROOF_TOLERANCE)
+
+            while True:
+                finished = all(future.done() for future in futures)
+                try:
+                    source, solution, weight = improvements.get(timeout=0.01)
+                    improve(solution, weight, source)
+                    continue
+                except queue.Empty:
+                    pass
+                if finished:
+                    break
+                if proven() or time.time() >= stop_time:
+                    stop.set()
+        # The workers have exited, so everything they reported is in the queue
+        while True:
+            try:
+                source, solution, weight = improvements.get(timeout=0.01)
+            except queue.Empty:
+                break
+            improve(solution, weight, source)
+        for future in futures:
+            future.result()  # Re-raises a worker's error
+        optimal = proven()
+
+    end_time = time.time()
+    execution_time = end_time - start_time
+    return best['solution'], best['weight'], execution_time * 1000, optimal, history
@@ -1,40 +1,166 @@
-import random 
 import time
+import numpy as np
 
-def randomized_mwds(graph, weights, max_iterations=1000, max_time=100):
-    start_time = time.time()
-    best_solution = set()
+from src.algorithms.local_search import local_search
+from src.utils.csr_graph import as_csr
+from src.utils.instrumentation import current
+
+# Upper bound on trials x vertices held in one batch (bool/int32 matrices)
+BATCH_CELLS = 1 << 23
+# Steps between checks that drop trials which can no longer win
+PRUNE_INTERVAL = 16
+# Largest padded neighborhood matrix accepted, relative to the CSR size
+PADDING_LIMIT = 4
+
+
+def _replay(graph, order):
+    """Rebuilds the candidate solution of one trial from its vertex order."""
+    w = graph.weights.tolist()
+    dominated = np.zeros(graph.number_of_nodes(), dtype=bool)
+    solution = []
+    weight = 0.0
+    for vertex in order.tolist():
+        if not dominated[vertex]:
+            solution.append(vertex)
+            weight += w[vertex]
+            dominated[graph.closed_neighborhood(vertex)] = True
+    return solution, weight
+
+
+def _padded_neighborhoods(graph):
+    """
+    Closed neighborhoods as an n x max_degree matrix, padded by repeating the
+    vertex itself (marking it dominated twice is harmless). Returns None when
+    degrees are too skewed for the padding to pay off.
+    """
+    n = graph.number_of_nodes()
+    lengths = np.diff(graph.closed_indptr)
+    width = int(lengths.max()) if n else 0
+    if n * width > PADDING_LIMIT * max(len(graph.closed_indices), 1):
+        return None
+    # int64 so adding the per-trial row offsets needs no upcast
+    padded = np.repeat(np.arange(n, dtype=np.int64)[:, None], width, axis=1)
+    columns = np.arange(len(graph.closed_indices)) - np.repeat(graph.closed_indptr[:-1], lengths)
+    padded[np.repeat(np.arange(n), lengths), columns] = graph.closed_indices
+    return padded
+
+
+def _run_batch(graph, orders, best_weight, padded=None, external_bound=None, interrupt=None):
+    """
+    Runs one batch of trials in lockstep. `orders` holds one shuffled vertex
+    order per column, so step t reads row t for every trial at once.
+
+    Every PRUNE_INTERVAL steps, trials whose running weight already reaches
+    the best weight (or exceeds `external_bound()`) are dropped, since they
+    can no longer win; the batch is abandoned when `interrupt()` returns
+    True. Returns the column of the best trial (or None), its
+    weight and the number of vertex visits performed.
+    """
+    n, batch = orders.shape
+    w = graph.weights
+    trial_ids = np.arange(batch)
+    offsets = trial_ids * n
+    dominated = np.zeros(batch * n, dtype=bool)
+    weight = np.zeros(batch)
+    visits = 0
+    for t in range(n):
+        visits += len(trial_ids)
+        column = orders[t] if len(trial_ids) == batch else orders[t, trial_ids]
+        flat = offsets + column
+        rows = np.flatnonzero(~dominated[flat])
+        if len(rows):
+            vertices = column[rows]
+            weight[rows] += w[vertices]
+            if padded is not None:
+                dominated[offsets[rows, None] + padded[vertices]] = True
+            else:
+                neighbors, lengths = graph.gather(vertices, closed=True)
+                dominated[np.repeat(offsets[rows], lengths) + neighbors] = True
+        if t % PRUNE_INTERVAL or t == n - 1:
+            continue
+        if interrupt is not None and interrupt():
+            return None, best_weight, visits
+        keep = weight < best_weight
+        if external_bound is not None:
+            keep &= weight <= external_bound()
+        if not keep.all():
+            trial_ids = trial_ids[keep]
+            if not len(trial_ids):
+                return None, best_weight, visits
+            weight = weight[keep]
+            offsets = offsets[keep]
+            # Compact the dominated matrix once enough rows have been dropped
+            if len(trial_ids) * 2 <= len(dominated) // n:
+                dominated = dominated.reshape(-1, n)[offsets // n].reshape(-1)
+                offsets = np.arange(len(trial_ids)) * n
+    # Every remaining trial has visited all vertices, so its solution is complete
+    row = int(np.argmin(weight))
+    if weight[row] < best_weight:
+        return int(trial_ids[row]), weight[row], visits
+    return None, best_weight, visits
+
+
+def _run_trials(graph, rng, num_trials, deadline=None, batch_size=None,
+                external_bound=None, on_improvement=None, interrupt=None):
+    """
+    Runs up to `num_trials` randomized constructions in batches, stopping at
+    `deadline` (a time.time() value) or once `interrupt()` returns True. Returns the best vertex list, its
+    weight, the number of trials finished and the number of vertex visits.
+    """
+    n = graph.number_of_nodes()
+    if batch_size is None:
+        batch_size = max(1, min(4096, BATCH_CELLS // max(n, 1)))
+    metrics = current()
+    with metrics.phase('randomized.setup'):
+        padded = _padded_neighborhoods(graph)
+    best_solution = []
     best_weight = float('inf')
+    trials_done = 0
     num_basic_operations = 0
-
-    for _ in range(max_iterations):
-        if time.time() - start_time > max_time:  # Stop if max_time is exceeded
+    while trials_done < num_trials:
+        if deadline is not None and time.time() > deadline:  # Stop if max_time is exceeded
             break
+        if interrupt is not None and interrupt():
+            break
+        batch = min(batch_size, num_trials - trials_done)
+        # Randomly shuffle vertices, one independent order per trial (one
+        # permutation call per trial is cheaper than Generator.permuted on int32)
+        with metrics.phase('randomized.shuffle'):
+            orders = np.stack([rng.permutation(n) for _ in range(batch)]).astype(np.int32).T.copy()
+        with metrics.phase('randomized.trials'):
+            best_trial, weight, visits = _run_batch(graph, orders, best_weight, padded, external_bound, interrupt)
+        num_basic_operations += visits
+        trials_done += batch
+        if best_trial is not None:
+            best_solution, best_weight = _replay(graph, orders[:, best_trial])
+            metrics.count('randomized.improvements')
+            if on_improvement is not None:
+                on_improvement(best_solution, best_weight)
+    metrics.count('randomized.trials', trials_done)
+    metrics.count('randomized.vertex_visits', num_basic_operations)
+    return best_solution, best_weight, trials_done, num_basic_operations
+
 
-        # Randomly shuffle vertices
-        vertices = list(graph.nodes)
-        random.shuffle(vertices)
-
-        # Build a candidate dominating set
-        candidate_solution = set()
-        dominated = set()
-        candidate_weight = 0
-
-        for vertex in vertices:
-            if vertex not in dominated:
-                # Add vertex to the solution
-                candidate_solution.add(vertex)
-                candidate_weight += weights[vertex]
-                # Mark vertex and its neighbors as dominated
-                dominated.add(vertex)
-                dominated.update(graph.neighbors(vertex))
-            num_basic_operations += 1
-
-        # Update the best solution if the candidate is better
-        if candidate_weight < best_weight:
-            best_solution = candidate_solution
-            best_weight = candidate_weight
+def randomized_mwds(graph, weights=None, max_iterations=1000, max_time=100, rng=None,
+                    batch_size=None, local_search_time=None):
+    """
+    Best of `max_iterations` randomized constructions: each trial visits the
+    vertices in a random order and adds every vertex not yet dominated.
 
+    Trials run in vectorized batches over the CSR arrays, and a trial stops as
+    soon as its weight can no longer beat the best one. `max_time` is a budget
+    in milliseconds; `rng` is a seed or a numpy Generator for reproducible runs.
+    With `local_search_time` (ms) the best trial is refined by `local_search`.
+    """
+    graph = as_csr(graph, weights)
+    rng = np.random.default_rng(rng)
+    start_time = time.time()
+    best_solution, best_weight, _, num_basic_operations = _run_trials(
+        graph, rng, max_iterations, start_time + max_time / 1000, batch_size)
+    best_solution = set(graph.to_labels(best_solution))
+    if local_search_time is not None and best_solution:
+        best_solution, best_weight, _, moves = local_search(graph, None, best_solution, local_search_time)
+        num_basic_operations += moves
     end_time = time.time()
     execution_time = end_time - start_time
     return best_solution, best_weight, execution_time * 1000, num_basic_operations
@@ -0,0 +1,200 @@
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from src.algorithms.greedy_heuristic import greedy_dominating_set
+from src.utils.csr_graph import CSRGraph, as_csr
+from src.utils.instrumentation import current
+
+# Components solved in worker processes only from this many on
+PARALLEL_MIN_COMPONENTS = 16
+
+
+class Reduction:
+    """
+    Result of `reduce_graph`: vertices forced into every solution plus the
+    reduced components left to solve.
+
+    Each component is a CSRGraph whose labels are vertex indices of the
+    original graph. A vertex that is already dominated but may still be
+    chosen (to dominate others) gets a zero-weight pendant, labelled with a
+    negative number, so the component solver never has to dominate it.
+    """
+
+    def __init__(self, graph, forced, components, rules):
+        self.graph = graph
+        self.forced = forced
+        self.components = components
+        self.rules = rules
+
+    def largest_component(self):
+        return max((component.number_of_nodes() for component in self.components), default=0)
+
+    def lift(self, component_solutions):
+        """Maps one solution per component back to a set of original labels and its weight."""
+        chosen = set(self.forced)
+        for solution in component_solutions:
+            chosen.update(v for v in solution if v >= 0)
+        chosen = sorted(chosen)
+        w = self.graph.weights.tolist()
+        total_weight = sum(w[v] for v in chosen)
+        return set(self.graph.to_labels(chosen)), total_weight
+
+
+def reduce_graph(G, weights=None):
+    """
+    Applies safe minimum weight dominating set reductions until none fires,
+    then splits what is left into connected components. Rules:
+    - forced vertex: an undominated vertex with a single remaining candidate
+      dominator (an isolated vertex, or a leaf whose neighbour was excluded)
+      puts that dominator in the solution;
+    - dominance: a candidate v is excluded when another candidate u with
+      w(u) <= w(v) dominates every undominated vertex of N[v], since v can
+      always be swapped for u. Leaves no lighter than their neighbour and
+      candidates with nothing left to dominate fall under this rule;
+    - a vertex that is dominated and no longer a candidate is deleted, as is
+      every edge that cannot help dominate an undominated vertex.
+    Each rule keeps at least one optimal solution, so solving the components
+    exactly and adding the forced vertices gives an optimum of G.
+    """
+    graph = as_csr(G, weights)
+    n = graph.number_of_nodes()
+    w = graph.weights.tolist()
+    ptr = graph.closed_indptr.tolist()
+    idx = graph.closed_indices.tolist()
+    closed = [idx[ptr[v]:ptr[v + 1]] for v in range(n)]
+    # undominated[v]: undominated vertices of N[v]; dominators[v]: candidates in N[v]
+    undominated = [set(neighborhood) for neighborhood in closed]
+    dominators = [set(neighborhood) for neighborhood in closed]
+    is_dominated = bytearray(n)
+    is_candidate = bytearray(b'\x01') * n
+    forced = []
+    rules = {'forced': 0, 'excluded': 0}
+    queue = deque(range(n))
+    queued = bytearray(b'\x01') * n
+
+    def push(v):
+        if not queued[v]:
+            queued[v] = 1
+            queue.append(v)
+
+    def exclude(v):
+        is_candidate[v] = 0
+        for x in undominated[v]:
+            dominators[x].discard(v)
+            push(x)
+
+    def force(u):
+        forced.append(u)
+        rules['forced'] += 1
+        exclude(u)
+        for x in list(undominated[u]):
+            is_dominated[x] = 1
+            for y in closed[x]:
+                undominated[y].discard(x)
+                push(y)
+
+    def dominated_by_better(v):
+        targets = undominated[v]
+        # Any u covering targets is a dominator of its least dominated vertex
+        pivot = min(targets, key=lambda x: len(dominators[x]))
+        for u in dominators[pivot]:
+            if u != v and w[u] <= w[v] and len(undominated[u]) >= len(targets) \
+                    and targets <= undominated[u]:
+                return True
+        return False
+
+    while queue:
+        v = queue.popleft()
+        queued[v] = 0
+        if not is_dominated[v] and len(dominators[v]) == 1:
+            force(next(iter(dominators[v])))
+        elif is_candidate[v] and (not undominated[v] or dominated_by_better(v)):
+            rules['excluded'] += 1
+            exclude(v)
+
+    keep = [v for v in range(n) if not is_dominated[v] or (is_candidate[v] and undominated[v])]
+    adjacency = {v: [] for v in keep}
+    for v in keep:
+        if not is_candidate[v]:
+            continue
+        for u in undominated[v]:
+            if u != v:
+                adjacency[v].append(u)
+                adjacency[u].append(v)
+
+    components = []
+    seen = set()
+    for root in keep:
+        if root in seen:
+            continue
+        seen.add(root)
+        members = [root]
+        stack = [root]
+        while stack:
+            for u in adjacency[stack.pop()]:
+                if u not in seen:
+                    seen.add(u)
+                    members.append(u)
+                    stack.append(u)
+        components.append(_component_graph(members, adjacency, is_dominated, w))
+    rules['deleted'] = n - len(keep)
+    metrics = current()
+    for rule, count in rules.items():
+        metrics.count('reduction.' + rule, count)
+    metrics.count('reduction.components', len(components))
+    return Reduction(graph, forced, components, rules)
+
+
+def _component_graph(members, adjacency, is_dominated, w):
+    members.sort()
+    local = {v: i for i, v in enumerate(members)}
+    sources = []
+    targets = []
+    for v in members:
+        for u in adjacency[v]:
+            sources.append(local[v])
+            targets.append(local[u])
+    labels = list(members)
+    component_weights = [w[v] for v in members]
+    for v in members:
+        if is_dominated[v]:
+            sources.append(local[v])
+            targets.append(len(labels))
+            labels.append(-1 - v)
+            component_weights.append(0.0)
+    return CSRGraph.from_edges(len(labels), sources, targets, component_weights, labels)
+
+
+def _solve_component(solver, component, options):
+    return solver(component, **options)
+
+
+def solve_components(G, weights=None, solver=greedy_dominating_set, max_workers=None, **options):
+    """
+    Reduces G with `reduce_graph`, runs `solver(component, **options)` on
+    every component and lifts the solutions back. Any solver of this package
+    works (exact ones give an exact result). With PARALLEL_MIN_COMPONENTS or
+    more components they are solved on a process pool of `max_workers`
+    (max_workers=1 keeps everything in this process).
+
+    Returns (set, weight, time in ms, per-component solver results).
+    """
+    start_time = time.time()
+    reduction = reduce_graph(G, weights)
+    components = reduction.components
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers > 1 and len(components) >= PARALLEL_MIN_COMPONENTS:
+        # Largest components first so the pool stays busy until the end
+        order = sorted(range(len(components)), key=lambda i: -components[i].number_of_nodes())
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {i: executor.submit(_solve_component, solver, components[i], options)
+                       for i in order}
+            results = [futures[i].result() for i in range(len(components))]
+    else:
+        results = [_solve_component(solver, component, options) for component in components]
+    solution, total_weight = reduction.lift(result[0] for result in results)
+    end_time = time.time()
+    execution_time = end_time - start_time
+    return solution, total_weight, execution_time * 1000, results
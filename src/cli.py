@@ -0,0 +1,185 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+# Process CPU time spent before this module ran: interpreter start-up and imports
+_STARTUP_CPU = time.process_time()
+_CLI_START = time.perf_counter()
+
+# Every subcommand imports what it needs when it runs, so `solve` never loads
+# networkx or matplotlib and `--help` loads nothing at all
+
+
+def _greedy(graph, args):
+    from src.algorithms.greedy_heuristic import greedy_dominating_set
+    solution, weight, _, _ = greedy_dominating_set(graph)
+    return solution, weight
+
+
+def _randomized(graph, args):
+    from src.algorithms.randomized_search import randomized_mwds
+    solution, weight, _, _ = randomized_mwds(graph, max_time=args.budget_ms, rng=args.seed)
+    return solution, weight
+
+
+def _local_search(graph, args):
+    from src.algorithms.greedy_heuristic import greedy_dominating_set
+    solution, weight, _, _ = greedy_dominating_set(graph, local_search_time=args.budget_ms)
+    return solution, weight
+
+
+def _exact(graph, args):
+    from src.algorithms.exhaustive_search import exhaustive_search
+    # The budget applies to each reduced component
+    solution, weight, _, _, _ = exhaustive_search(graph, reduce=True, max_time=args.budget_ms)
+    return solution, weight
+
+
+def _portfolio(graph, args):
+    from src.algorithms.portfolio import solve
+    solution, weight, _, _, _ = solve(graph, deadline_ms=args.budget_ms, seed=args.seed)
+    return solution, weight
+
+
+def _external_greedy(file_path, args):
+    from src.algorithms.external_greedy import external_greedy
+    solution, weight, _, _, _ = external_greedy(file_path)
+    return solution, weight
+
+
+# name -> callable(graph, args) returning (set, weight); external_greedy gets the file path
+SOLVERS = {
+    'greedy': _greedy,
+    'randomized': _randomized,
+    'local_search': _local_search,
+    'exact': _exact,
+    'portfolio': _portfolio,
+    'external_greedy': _external_greedy
+}
+
+
+def _load_graph(file_path, recorder):
+    with recorder.phase('cli.import_reader'):
+        from src.utils.read_graph import read_csr_graph
+    with recorder.phase('cli.load_graph'):
+        graph, _, _, node_weights = read_csr_graph(file_path)
+        return graph.with_weights(node_weights)
+
+
+def _solver_input(args, recorder):
+    """What SOLVERS[args.solver] takes: the file path for external_greedy, else the loaded graph."""
+    if args.solver == 'external_greedy':
+        return args.file
+    return _load_graph(args.file, recorder)
+
+
+def _solve(args, recorder):
+    target = _solver_input(args, recorder)
+    with recorder.phase('cli.solve'):
+        solution, weight = SOLVERS[args.solver](target, args)
+    solution = sorted(solution)
+    if args.json:
+        print(json.dumps({'file': args.file, 'solver': args.solver, 'weight': float(weight),
+                          'size': len(solution), 'solution': solution}))
+    else:
+        print(f"{args.file}: {args.solver} weight {weight:.6f} with {len(solution)} vertices")
+    return 0
+
+
+def _experiment(args, recorder):
+    with recorder.phase('cli.import_runner'):
+        from src.utils.experiment_runner import run_experiments
+    densities = [float(density) for density in args.densities.split(',') if density]
+    cache_dir = None if args.no_cache else args.cache_dir
+    with recorder.phase('cli.experiment'):
+        run_experiments(args.max_n, densities, args.seed, args.exact_max_n, args.workers,
+                        args.results, cache_dir=cache_dir)
+    return 0
+
+
+def _bench(args, recorder):
+    with recorder.phase('cli.import_benchmark'):
+        from src.utils import benchmark
+    with recorder.phase('cli.bench'):
+        return benchmark.main(args.bench_args)
+
+
+def _plot(args, recorder):
+    with recorder.phase('cli.import_plotting'):
+        from src.utils import results_visualization
+    with recorder.phase('cli.plot'):
+        if args.file is None:
+            os.makedirs('plots', exist_ok=True)
+            results_visualization.visualize_results(show=args.show)
+            print("Wrote the result plots to plots/")
+            return 0
+        solution = ()
+        if args.solver:
+            solution, _ = SOLVERS[args.solver](_solver_input(args, recorder), args)
+        path = results_visualization.visualize_graph_file(args.file, solution, args.output)
+    print(f"Wrote {path}")
+    return 0
+
+
+def _print_timings(recorder, stream=sys.stderr):
+    metrics = recorder.as_dict()
+    print("Start-up and run time (ms):", file=stream)
+    print(f"  {'interpreter start-up (cpu)':<32} {_STARTUP_CPU * 1000:9.1f}", file=stream)
+    for name, value in metrics['phases_ms'].items():
+        print(f"  {name:<32} {value:9.1f}", file=stream)
+    print(f"  {'total since cli start':<32} {(time.perf_counter() - _CLI_START) * 1000:9.1f}", file=stream)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m src.cli',
+                                     description="Minimum weight dominating set solvers and experiments.")
+    parser.add_argument('--timings', action='store_true', help="print a start-up and run time breakdown")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    solve_parser = commands.add_parser('solve', help="solve one Sedgewick & Wayne graph file")
+    solve_parser.add_argument('file')
+    solve_parser.add_argument('--solver', choices=sorted(SOLVERS), default='greedy')
+    solve_parser.add_argument('--budget-ms', type=float, default=1000,
+                              help="time budget of the randomized, local search, exact and portfolio solvers")
+    solve_parser.add_argument('--seed', type=int, default=102620)
+    solve_parser.add_argument('--json', action='store_true', help="print the result, with the solution, as JSON")
+
+    experiment_parser = commands.add_parser('experiment', help="run the random graph experiments")
+    experiment_parser.add_argument('--max-n', type=int, default=100)
+    experiment_parser.add_argument('--densities', default='0.125,0.25,0.5,0.75')
+    experiment_parser.add_argument('--seed', type=int, default=102620)
+    experiment_parser.add_argument('--exact-max-n', type=int, default=100)
+    experiment_parser.add_argument('--workers', type=int)
+    experiment_parser.add_argument('--results', default='experiment_results.jsonl')
+    experiment_parser.add_argument('--cache-dir', default='.result_cache')
+    experiment_parser.add_argument('--no-cache', action='store_true')
+
+    bench_parser = commands.add_parser('bench', help="run or compare benchmarks (see src/utils/benchmark.py)")
+    bench_parser.add_argument('bench_args', nargs=argparse.REMAINDER)
+
+    plot_parser = commands.add_parser('plot', help="plot the experiment results, or a graph file")
+    plot_parser.add_argument('file', nargs='?', help="graph file to draw (default: plot experiment_results.csv)")
+    plot_parser.add_argument('--solver', choices=sorted(SOLVERS), help="highlight this solver's solution")
+    plot_parser.add_argument('--output', help="image path (default: plots/<file name>.png)")
+    plot_parser.add_argument('--show', action='store_true', help="also open the result plots in a window")
+    plot_parser.add_argument('--budget-ms', type=float, default=1000)
+    plot_parser.add_argument('--seed', type=int, default=102620)
+    args = parser.parse_args(argv)
+
+    from src.utils.instrumentation import recording
+    commands = {'solve': _solve, 'experiment': _experiment, 'bench': _bench, 'plot': _plot}
+    with recording() as recorder:
+        try:
+            status = commands[args.command](args, recorder)
+        except TimeoutError as error:
+            print(f"error: {error}", file=sys.stderr)
+            status = 1
+    if args.timings:
+        _print_timings(recorder)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+import argparse
+import glob
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from src.algorithms.exhaustive_search import exhaustive_search
+from src.algorithms.greedy_heuristic import greedy_dominating_set
+from src.algorithms.local_search import local_search
+from src.algorithms.lower_bound import lagrangian_lower_bound
+from src.algorithms.randomized_search import randomized_mwds
+from src.utils.graph_gen import generate_random_csr_graph
+from src.utils.read_graph import read_csr_graph
+
+# Generated cases: every size with every density, using the experiments' seed
+SIZES = (20, 50, 100, 500, 1000)
+DENSITIES = (0.125, 0.25, 0.5, 0.75)
+SEED = 102620
+# Largest graph given to the exact solver
+EXACT_MAX_VERTICES = 50
+# Fixed budgets so results only depend on the code (ms)
+RANDOMIZED_MAX_TIME = 60000
+LOCAL_SEARCH_MAX_TIME = 60000
+# Default regression thresholds for `compare`
+TIME_TOLERANCE = 0.10
+MIN_TIME_DIFFERENCE = 1.0
+WEIGHT_TOLERANCE = 1e-9
+
+
+def _local_search(graph):
+    greedy_set, _, _, _ = greedy_dominating_set(graph)
+    return local_search(graph, None, greedy_set, LOCAL_SEARCH_MAX_TIME)
+
+
+# name -> (callable returning the solver's tuple, whether it only runs on small graphs)
+SOLVERS = {
+    'exhaustive': (lambda graph: exhaustive_search(graph), True),
+    'greedy': (lambda graph: greedy_dominating_set(graph), False),
+    'randomized': (lambda graph: randomized_mwds(graph, max_time=RANDOMIZED_MAX_TIME, rng=SEED), False),
+    'local_search': (_local_search, False),
+    'lower_bound': (lambda graph: lagrangian_lower_bound(graph), False)
+}
+
+
+def _cases(data_folder, sizes, densities):
+    """Yields (case name, graph) for every data/SW*.txt file and every generated size and density."""
+    for file_path in sorted(glob.glob(os.path.join(data_folder, "SW*.txt"))):
+        graph, _, _, node_weights = read_csr_graph(file_path)
+        yield os.path.basename(file_path), graph.with_weights(node_weights)
+    for n in sizes:
+        for density in densities:
+            graph, _, _ = generate_random_csr_graph(n, density, SEED, compat=True)
+            yield f"random_n{n}_d{density}", graph
+
+
+def percentile(values, q):
+    """Nearest-rank percentile (q in [0, 100])."""
+    ordered = sorted(values)
+    rank = max(1, int(np.ceil(q / 100 * len(ordered))))
+    return ordered[rank - 1]
+
+
+def _measure(solve, graph, warmup, repeats):
+    for _ in range(warmup):
+        solve(graph)
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter_ns()
+        result = solve(graph)
+        times.append((time.perf_counter_ns() - start) / 1e6)
+    # Memory is traced in a separate run so it does not slow the timed ones
+    tracemalloc.start()
+    try:
+        solve(graph)
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    # The lower bound returns the bound first; the others return (set, weight, ...)
+    weight = result[0] if isinstance(result[0], float) else result[1]
+    return {
+        'times_ms': times,
+        'median_ms': float(np.median(times)),
+        'p95_ms': percentile(times, 95),
+        'peak_memory_bytes': peak_memory,
+        'weight': weight
+    }
+
+
+def run_benchmarks(data_folder="data", solvers=None, sizes=SIZES, densities=DENSITIES,
+                   warmup=1, repeats=5, log=print):
+    """
+    Runs every solver on every case `warmup` + `repeats` times and returns
+    the report: metadata plus one result per (case, solver) with the timings,
+    their median and p95, the peak traced memory and the solution weight.
+    """
+    solvers = list(solvers or SOLVERS)
+    results = []
+    for case, graph in _cases(data_folder, sizes, densities):
+        n = graph.number_of_nodes()
+        for name in solvers:
+            solve, small_only = SOLVERS[name]
+            if small_only and n > EXACT_MAX_VERTICES:
+                continue
+            measurement = _measure(solve, graph, warmup, repeats)
+            results.append({'case': case, 'solver': name, 'n': n,
+                            'm': graph.number_of_edges(), **measurement})
+            log(f"{case:<28} {name:<13} median {measurement['median_ms']:10.2f} ms  "
+                f"p95 {measurement['p95_ms']:10.2f} ms  weight {measurement['weight']:.6f}")
+    return {
+        'meta': {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'warmup': warmup,
+            'repeats': repeats
+        },
+        'results': results
+    }
+
+
+def compare_reports(baseline, current, time_tolerance=TIME_TOLERANCE,
+                    min_time_difference=MIN_TIME_DIFFERENCE, weight_tolerance=WEIGHT_TOLERANCE):
+    """
+    Lists the regressions of `current` against `baseline`, matching results
+    by (case, solver): a median time more than `time_tolerance` (relative)
+    and `min_time_difference` ms slower, or a weight more than
+    `weight_tolerance` (relative) heavier. Returns a list of messages.
+    """
+    baseline_results = {(result['case'], result['solver']): result for result in baseline['results']}
+    regressions = []
+    for result in current['results']:
+        before = baseline_results.get((result['case'], result['solver']))
+        if before is None:
+            continue
+        label = f"{result['case']} / {result['solver']}"
+        slower = result['median_ms'] - before['median_ms']
+        if slower > min_time_difference and result['median_ms'] > before['median_ms'] * (1 + time_tolerance):
+            regressions.append(f"time: {label} median {before['median_ms']:.2f} -> "
+                               f"{result['median_ms']:.2f} ms ({slower / before['median_ms']:+.1%})")
+        if result['solver'] == 'lower_bound':
+            # A lower bound regresses when it gets weaker, i.e. smaller
+            worse = before['weight'] - result['weight']
+        else:
+            worse = result['weight'] - before['weight']
+        if worse > weight_tolerance * max(abs(before['weight']), 1.0):
+            regressions.append(f"quality: {label} weight {before['weight']:.6f} -> {result['weight']:.6f}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks the MWDS solvers and tracks regressions.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run', help="run the benchmarks and write a JSON report")
+    run_parser.add_argument('--output', default='benchmark.json')
+    run_parser.add_argument('--data', default='data', help="folder with the SW*.txt files")
+    run_parser.add_argument('--solvers', default=','.join(SOLVERS),
+                            help="comma-separated subset of: " + ', '.join(SOLVERS))
+    run_parser.add_argument('--sizes', default=','.join(map(str, SIZES)))
+    run_parser.add_argument('--densities', default=','.join(map(str, DENSITIES)))
+    run_parser.add_argument('--warmup', type=int, default=1)
+    run_parser.add_argument('--repeats', type=int, default=5)
+    compare_parser = commands.add_parser('compare', help="flag regressions against a baseline report")
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--time-tolerance', type=float, default=TIME_TOLERANCE)
+    compare_parser.add_argument('--min-time-difference', type=float, default=MIN_TIME_DIFFERENCE,
+                                help="ignore slowdowns smaller than this many ms")
+    compare_parser.add_argument('--weight-tolerance', type=float, default=WEIGHT_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        solvers = [name for name in args.solvers.split(',') if name]
+        unknown = set(solvers) - set(SOLVERS)
+        if unknown:
+            parser.error(f"unknown solvers: {', '.join(sorted(unknown))}")
+        sizes = [int(n) for n in args.sizes.split(',') if n]
+        densities = [float(d) for d in args.densities.split(',') if d]
+        report = run_benchmarks(args.data, solvers, sizes, densities, args.warmup, args.repeats)
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+        print(f"Wrote {len(report['results'])} results to {args.output}")
+        return 0
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    with open(args.current) as file:
+        current = json.load(file)
+    regressions = compare_reports(baseline, current, args.time_tolerance,
+                                  args.min_time_difference, args.weight_tolerance)
+    for message in regressions:
+        print(message)
+    print(f"{len(regressions)} regression(s)")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
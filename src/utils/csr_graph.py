@@ -0,0 +1,194 @@
+import numpy as np
+
+
+class CSRGraph:
+    """
+    Immutable, array-backed undirected graph shared by all solvers.
+
+    Vertices are the integers 0..n-1; the original node labels are kept in
+    `labels` so solutions can be mapped back. Adjacency is stored twice in
+    CSR form:
+    - `indptr` / `indices`: open neighborhoods N(v), sorted, no self-loops.
+    - `closed_indptr` / `closed_indices`: closed neighborhoods N[v] = N(v) + {v}.
+    `weights` is a float64 vector indexed by vertex.
+    """
+
+    __slots__ = ('indptr', 'indices', 'closed_indptr', 'closed_indices',
+                 'weights', 'labels', '_index')
+
+    def __init__(self, indptr, indices, weights, labels=None,
+                 closed_indptr=None, closed_indices=None):
+        indptr = np.ascontiguousarray(indptr, dtype=np.int64)
+        indices = np.ascontiguousarray(indices, dtype=np.int32)
+        weights = np.ascontiguousarray(weights, dtype=np.float64)
+        n = len(indptr) - 1
+        if len(weights) != n:
+            raise ValueError(f"Expected {n} weights, got {len(weights)}")
+        if closed_indptr is None or closed_indices is None:
+            closed_indptr, closed_indices = _closed_neighborhoods(indptr, indices)
+        closed_indptr = np.ascontiguousarray(closed_indptr, dtype=np.int64)
+        closed_indices = np.ascontiguousarray(closed_indices, dtype=np.int32)
+        for array in (indptr, indices, weights, closed_indptr, closed_indices):
+            array.flags.writeable = False
+        set_ = object.__setattr__
+        set_(self, 'indptr', indptr)
+        set_(self, 'indices', indices)
+        set_(self, 'closed_indptr', closed_indptr)
+        set_(self, 'closed_indices', closed_indices)
+        set_(self, 'weights', weights)
+        set_(self, 'labels', tuple(range(n)) if labels is None else tuple(labels))
+        set_(self, '_index', None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CSRGraph is immutable")
+
+    def __reduce__(self):
+        return (CSRGraph, (self.indptr, self.indices, self.weights, self.labels,
+                           self.closed_indptr, self.closed_indices))
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+    def __repr__(self):
+        return f"CSRGraph(n={self.number_of_nodes()}, m={self.number_of_edges()})"
+
+    @classmethod
+    def from_edges(cls, num_vertices, sources, targets, weights, labels=None):
+        """
+        Builds the graph from parallel arrays of edge endpoints given as
+        vertex indices. Edges are treated as undirected; self-loops and
+        duplicates are dropped.
+        """
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        keep = sources != targets
+        sources, targets = sources[keep], targets[keep]
+        # Symmetrize and deduplicate through a single sort on (row, col) keys
+        rows = np.concatenate((sources, targets))
+        cols = np.concatenate((targets, sources))
+        keys = np.unique(rows * num_vertices + cols)
+        rows = keys // num_vertices
+        cols = keys % num_vertices
+        indptr = np.zeros(num_vertices + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=num_vertices), out=indptr[1:])
+        return cls(indptr, cols, weights, labels)
+
+    @classmethod
+    def from_networkx(cls, G, weights=None):
+        """
+        Builds the graph from a NetworkX graph, e.g. the one returned by
+        `read_graph`. `weights` maps node -> weight; when omitted the 'weight'
+        node attribute is used.
+        """
+        labels = list(G.nodes())
+        index = {v: i for i, v in enumerate(labels)}
+        if weights is None:
+            weights = {v: data['weight'] for v, data in G.nodes(data=True)}
+        edges = np.array([(index[u], index[v]) for u, v in G.edges()],
+                         dtype=np.int64).reshape(-1, 2)
+        weight_vector = np.array([weights[v] for v in labels], dtype=np.float64)
+        return cls.from_edges(len(labels), edges[:, 0], edges[:, 1], weight_vector, labels)
+
+    def with_weights(self, weights):
+        """Returns a graph sharing this adjacency but with new vertex weights."""
+        if isinstance(weights, dict):
+            weights = [weights[v] for v in self.labels]
+        return CSRGraph(self.indptr, self.indices, weights, self.labels,
+                        self.closed_indptr, self.closed_indices)
+
+    def number_of_nodes(self):
+        return len(self.indptr) - 1
+
+    def number_of_edges(self):
+        return len(self.indices) // 2
+
+    def nodes(self):
+        return range(len(self.indptr) - 1)
+
+    def degree(self, v=None):
+        degrees = np.diff(self.indptr)
+        return degrees if v is None else int(degrees[v])
+
+    def neighbors(self, v):
+        """Open neighborhood of `v` as a read-only view (no copy)."""
+        return self.indices[self.indptr[v]:self.indptr[v + 1]]
+
+    def closed_neighborhood(self, v):
+        """Closed neighborhood of `v` as a read-only view (no copy)."""
+        return self.closed_indices[self.closed_indptr[v]:self.closed_indptr[v + 1]]
+
+    def gather(self, vertices, closed=False):
+        """
+        Concatenated neighborhoods of all `vertices` as one array, plus the
+        per-vertex lengths, computed without a Python-level loop.
+        """
+        indptr, indices = ((self.closed_indptr, self.closed_indices) if closed
+                           else (self.indptr, self.indices))
+        vertices = np.asarray(vertices, dtype=np.int64)
+        starts = indptr[vertices]
+        lengths = indptr[vertices + 1] - starts
+        total = int(lengths.sum())
+        if total == 0:
+            return indices[:0], lengths
+        # Position k of the output reads indices[starts[i] + (k - offset_i)]
+        offsets = np.cumsum(lengths) - lengths
+        positions = np.arange(total, dtype=np.int64) + np.repeat(starts - offsets, lengths)
+        return indices[positions], lengths
+
+    def cheapest_dominators(self, vertices):
+        """
+        The lightest vertex of the closed neighborhood of each of `vertices`
+        (the first one in neighborhood order on ties), computed without a
+        Python-level loop.
+        """
+        vertices = np.asarray(vertices, dtype=np.int64)
+        if not len(vertices):
+            return vertices
+        neighbors, lengths = self.gather(vertices, closed=True)
+        # Closed neighborhoods are never empty, so reduceat has no empty segments
+        starts = np.cumsum(lengths) - lengths
+        neighbor_weights = self.weights[neighbors]
+        lightest = np.minimum.reduceat(neighbor_weights, starts)
+        matches = np.flatnonzero(neighbor_weights == np.repeat(lightest, lengths))
+        segments = np.repeat(np.arange(len(vertices)), lengths)[matches]
+        _, first = np.unique(segments, return_index=True)
+        return neighbors[matches[first]]
+
+    def index_of(self, label):
+        if self._index is None:
+            object.__setattr__(self, '_index', {v: i for i, v in enumerate(self.labels)})
+        return self._index[label]
+
+    def to_labels(self, vertices):
+        return [self.labels[v] for v in vertices]
+
+    def nbytes(self):
+        return sum(array.nbytes for array in
+                   (self.indptr, self.indices, self.closed_indptr,
+                    self.closed_indices, self.weights))
+
+
+def _closed_neighborhoods(indptr, indices):
+    n = len(indptr) - 1
+    closed_indptr = indptr + np.arange(n + 1, dtype=np.int64)
+    closed_indices = np.empty(len(indices) + n, dtype=np.int32)
+    # Each vertex goes first in its own closed neighborhood
+    own = closed_indptr[:-1]
+    closed_indices[own] = np.arange(n, dtype=np.int32)
+    mask = np.ones(len(closed_indices), dtype=bool)
+    mask[own] = False
+    closed_indices[mask] = indices
+    return closed_indptr, closed_indices
+
+
+def as_csr(G, weights=None):
+    """
+    Returns a CSRGraph for `G`, converting a NetworkX graph on the fly. When
+    `G` already is a CSRGraph it is reused as-is unless `weights` is a dict
+    that should override its weight vector.
+    """
+    if isinstance(G, CSRGraph):
+        if weights is None or weights is G.weights:
+            return G
+        return G.with_weights(weights)
+    return CSRGraph.from_networkx(G, weights)
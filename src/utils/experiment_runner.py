@@ -1,70 +1,203 @@
 import networkx as nx
 import csv
-from graph_gen import generate_random_graph
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from src.utils.graph_gen import generate_random_graph
 from src.algorithms.exhaustive_search import exhaustive_search
-from src.algorithms.randomized_search import randomized_mwds 
+from src.algorithms.randomized_search import randomized_mwds
 from src.algorithms.greedy_heuristic import greedy_dominating_set
+from src.algorithms.lower_bound import lagrangian_lower_bound
+from src.utils.csr_graph import CSRGraph
+from src.utils.instrumentation import recording
+from src.utils.result_cache import DEFAULT_DIRECTORY, ResultCache
 
-def run_experiments(max_n, densities, seed):
-    results = []
-    for n in range(4, max_n):
-        for density in densities:
-            print(f"Running experiments for n={n}, density={density}")
-            G, weights, positions = generate_random_graph(n, density, seed)
+# Default per-algorithm time budgets in ms (None means unlimited); sparse
+# graphs near exact_max_n can keep the exact search busy for minutes
+DEFAULT_TIME_BUDGETS = {
+    'exhaustive': 30000,
+    'greedy': None,
+    'randomized': 5000,
+    'lower_bound': 1000
+}
+
+def _job_key(n, density, algorithm):
+    return (n, float(density), algorithm)
+
+def _run_job(n, density, algorithm, seed, time_budget, cache_dir=None, record_memory=False, profile=False):
+    """
+    Generates the (n, density) graph and runs one algorithm on it; returns a
+    result record, with the metrics recorded while the algorithm ran.
+    """
+    if cache_dir is not None:
+        run = ResultCache(cache_dir).run
+    else:
+        run = lambda solver, graph, **params: solver(graph, **params)
+    G, weights, positions = generate_random_graph(n, density, seed)
+    record = {'n': n, 'density': density, 'algorithm': algorithm, 'status': 'ok',
+              'weight': None, 'time': None, 'ops': None, 'configs': None}
+    if algorithm == 'greedy':
+        # Each (n, density) has exactly one greedy job, so it saves the graph
+        graphml_path = f"graphs/graph_n{n}_d{density}.graphml"
+        if not os.path.exists(graphml_path):
             # Assign positions and weights as node attributes
             nx.set_node_attributes(G, weights, 'weight')
             # Save the graph using GraphML
-            nx.write_graphml(G, f"graphs/graph_n{n}_d{density}.graphml")
-            # Run exhaustive search if feasible
-            if n <= 23:  # Adjust this limit based on your computational resources
-                (exhaustive_set, min_weight, total_configs_tested,
-                 exec_time_exhaustive, num_ops_exhaustive) = exhaustive_search(G, weights)
-                print(f"Exhaustive min dominating set weight: {min_weight}")
-                # visualize_dominating_set(G, exhaustive_set, n, density)
-            else:
-                min_weight = None
-                total_configs_tested = None
-                exec_time_exhaustive = None
-                num_ops_exhaustive = None
-            # Run greedy heuristic
-            (greedy_set, greedy_weight, exec_time_greedy,
-             num_ops_greedy) = greedy_dominating_set(G, weights)
-            # print(f"Greedy min dominating set weight: {greedy_weight}")
-            # visualize_dominating_set(G, greedy_set, n, density)
+            nx.write_graphml(G, graphml_path)
+    # Build the array-backed graph once for the solver
+    G = CSRGraph.from_networkx(G, weights)
+    with recording(record_memory, profile) as metrics:
+        _run_algorithm(run, G, algorithm, seed, time_budget, record)
+    record['metrics'] = metrics.as_dict()
+    return record
+
+def _run_algorithm(run, G, algorithm, seed, time_budget, record):
+    """Runs one algorithm through `run` (cached or not), filling in `record`."""
+    if algorithm == 'exhaustive':
+        try:
+            (_, record['weight'], record['configs'],
+             record['time'], record['ops']) = run(
+                exhaustive_search, G, max_time=time_budget)
+        except TimeoutError:
+            record['status'] = 'timeout'
+    elif algorithm == 'greedy':
+        _, record['weight'], record['time'], record['ops'] = run(
+            greedy_dominating_set, G, local_search_time=time_budget)
+    elif algorithm == 'randomized':
+        _, record['weight'], record['time'], record['ops'] = run(
+            randomized_mwds, G, max_iterations=1000, max_time=time_budget, rng=seed)
+    elif algorithm == 'lower_bound':
+        # Upper bound for the subgradient step size
+        _, upper_bound, _, _ = run(greedy_dominating_set, G, local_search_time=100)
+        record['weight'], record['time'], record['ops'] = run(
+            lagrangian_lower_bound, G, upper_bound=upper_bound, max_time=time_budget)
+    else:
+        raise ValueError(f"Unknown algorithm: {algorithm}")
 
-            (randomized_set, randomized_weight, exec_time_random, num_ops_random) = randomized_mwds(G, weights, max_iterations=1000, max_time=5000)
-            # print(f"Random min dominating set weight: {randomized_weight}")
-            # print(f"Random execution time: {exec_time_random}")
-            # visualize_dominating_set(G, randomized_set, n, density)
+def _load_records(results_path):
+    records = {}
+    if os.path.exists(results_path):
+        with open(results_path, 'r') as file:
+            for line in file:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Line cut short by a crash
+                records[_job_key(record['n'], record['density'], record['algorithm'])] = record
+    return records
 
+def _assemble_rows(records, ns, densities):
+    """Joins the per-algorithm records into one row per (n, density), as in experiment_results.csv."""
+    results = []
+    for n in ns:
+        for density in densities:
+            get = lambda algorithm: records.get(_job_key(n, density, algorithm), {})
+            exhaustive, greedy, randomized = get('exhaustive'), get('greedy'), get('randomized')
+            min_weight = exhaustive.get('weight')
+            greedy_weight = greedy.get('weight')
+            randomized_weight = randomized.get('weight')
             # Calculate precision if possible
-            if min_weight is not None:
-                greedy_precision = greedy_weight / min_weight
-                randomized_precision = randomized_weight / min_weight
+            greedy_precision = randomized_precision = None
+            lower_bound = greedy_gap = randomized_gap = None
+            # Failed or missing jobs leave their weight as None
+            ratio = lambda weight, reference: None if weight is None else weight / reference
+            if min_weight:
+                greedy_precision = ratio(greedy_weight, min_weight)
+                randomized_precision = ratio(randomized_weight, min_weight)
             else:
-                greedy_precision = None
-                randomized_precision = None
-            # Record the results
+                # Without the optimum, measure the gap to a Lagrangian lower bound
+                lower_bound = get('lower_bound').get('weight')
+                if lower_bound:
+                    gap = lambda weight: None if weight is None else (weight - lower_bound) / lower_bound
+                    greedy_gap = gap(greedy_weight)
+                    randomized_gap = gap(randomized_weight)
             results.append({
                 'n': n,
                 'density': density,
                 'exhaustive_weight': min_weight,
-                'exhaustive_time': exec_time_exhaustive,
-                'exhaustive_ops': num_ops_exhaustive,
-                'exhaustive_configs': total_configs_tested,
+                'exhaustive_time': exhaustive.get('time'),
+                'exhaustive_ops': exhaustive.get('ops'),
+                'exhaustive_configs': exhaustive.get('configs'),
                 'greedy_weight': greedy_weight,
-                'greedy_time': exec_time_greedy,
-                'greedy_ops': num_ops_greedy,
+                'greedy_time': greedy.get('time'),
+                'greedy_ops': greedy.get('ops'),
                 'greedy_precision': greedy_precision,
                 'randomized_weight': randomized_weight,
-                'randomized_time': exec_time_random,
-                'randomized_ops': num_ops_random,
-                'randomized_precision': randomized_precision
+                'randomized_time': randomized.get('time'),
+                'randomized_ops': randomized.get('ops'),
+                'randomized_precision': randomized_precision,
+                'lower_bound': lower_bound,
+                'greedy_gap': greedy_gap,
+                'randomized_gap': randomized_gap
             })
-        # Save results to CSV
-        keys = results[0].keys()
-        with open('experiment_results.csv', 'w', newline='') as output_file:
-            dict_writer = csv.DictWriter(output_file, keys)
-            dict_writer.writeheader()
-            dict_writer.writerows(results)
+    return results
+
+def run_experiments(max_n, densities, seed, exact_max_n=100, max_workers=None,
+                    results_path='experiment_results.jsonl', time_budgets=None,
+                    cache_dir=DEFAULT_DIRECTORY, record_memory=False, profile=False):
+    """
+    Runs every (n, density, algorithm) job for 4 <= n < max_n on a process
+    pool; the exact search runs up to `exact_max_n` vertices and the
+    Lagrangian lower bound above it. Each finished job is appended as one JSON line to `results_path`,
+    and jobs already recorded there are skipped, so an interrupted sweep
+    resumes where it stopped. `time_budgets` overrides DEFAULT_TIME_BUDGETS
+    (ms per algorithm; an exact search that runs out is recorded as a
+    timeout). Solver results are also reused from the result cache in
+    `cache_dir` (None disables it), so a fresh results file is rebuilt
+    without re-solving unchanged graphs. Every record carries the phase
+    timers and counters of its run, plus peak memory with `record_memory`
+    and a cProfile summary with `profile`. A job that raises is recorded with
+    status 'error' (and retried on the next run) instead of stopping the
+    sweep. Graphs are saved as GraphML under graphs/, and the joined table is
+    written to experiment_results.csv at the end.
+    """
+    budgets = dict(DEFAULT_TIME_BUDGETS, **(time_budgets or {}))
+    ns = range(4, max_n)
+    jobs = []
+    for n in ns:
+        for density in densities:
+            jobs.extend((n, density, algorithm) for algorithm in ('greedy', 'randomized'))
+            # The lower bound is only needed where there is no optimum to compare with
+            if n <= exact_max_n:  # Adjust this limit based on your computational resources
+                jobs.append((n, density, 'exhaustive'))
+            else:
+                jobs.append((n, density, 'lower_bound'))
+    records = _load_records(results_path)
+    pending = [job for job in jobs
+               if records.get(_job_key(*job), {}).get('status', 'error') == 'error']
+    # Longest jobs first so the pool stays busy until the end
+    pending.sort(key=lambda job: (job[2] != 'exhaustive', -job[0]))
+    print(f"{len(jobs) - len(pending)} of {len(jobs)} jobs already recorded in {results_path}")
+
+    if pending:
+        os.makedirs('graphs', exist_ok=True)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor, \
+                open(results_path, 'a') as output_file:
+            futures = {executor.submit(_run_job, n, density, algorithm, seed, budgets[algorithm],
+                                       cache_dir, record_memory, profile): (n, density, algorithm)
+                       for n, density, algorithm in pending}
+            for future in as_completed(futures):
+                try:
+                    record = future.result()
+                except Exception as error:
+                    n, density, algorithm = futures[future]
+                    record = {'n': n, 'density': density, 'algorithm': algorithm, 'status': 'error',
+                              'weight': None, 'time': None, 'ops': None, 'configs': None,
+                              'error': f"{type(error).__name__}: {error}"}
+                records[_job_key(record['n'], record['density'], record['algorithm'])] = record
+                output_file.write(json.dumps(record) + '\n')
+                output_file.flush()
+                print(f"Finished {record['algorithm']} for n={record['n']}, "
+                      f"density={record['density']}: {record['status']}, weight={record['weight']}")
+
+    results = _assemble_rows(records, ns, densities)
+    # Save results to CSV
+    keys = results[0].keys()
+    with open('experiment_results.csv', 'w', newline='') as output_file:
+        dict_writer = csv.DictWriter(output_file, keys)
+        dict_writer.writeheader()
+        dict_writer.writerows(results)
     return results
@@ -1,37 +1,144 @@
 import networkx as nx
+import numpy as np
 import random
-import itertools
 import math
 
-def generate_random_graph(n, edge_density, seed):
-    random.seed(seed)
-    G = nx.Graph()
-    # Add n nodes with random positions
+from src.utils.csr_graph import CSRGraph
+
+
+def _pair_count(n):
+    return n * (n - 1) // 2
+
+
+def decode_pairs(indices, n):
+    """
+    Maps indices into the lexicographic list of pairs (i, j), i < j < n (the
+    order of itertools.combinations(range(n), 2)) back to i and j arrays.
+    """
+    k = np.asarray(indices, dtype=np.int64)
+    row_start = lambda i: i * (2 * n - i - 1) // 2
+    # Closed-form row from the quadratic, then fix float rounding at the edges
+    i = (n - 2 - np.floor((np.sqrt(np.maximum(-8.0 * k + 4.0 * n * (n - 1) - 7, 0)) - 1) / 2)).astype(np.int64)
+    i = np.clip(i, 0, max(n - 2, 0))
+    while True:
+        low = row_start(i) > k
+        high = row_start(i + 1) <= k
+        if not (low.any() or high.any()):
+            break
+        i = i - low + high
+    j = k - row_start(i) + i + 1
+    return i, j
+
+
+def _place_points(n, draw, min_distance, size):
+    """
+    Places n integer points in [1, size]^2 that are at least `min_distance`
+    apart, by rejection. `draw()` returns the next candidate (x, y). A grid of
+    min_distance-sized cells limits each check to the 3x3 neighboring cells.
+    """
     positions = {}
+    grid = {}
+    cell = min_distance
     while len(positions) < n:
-        x, y = random.randint(1, 1000), random.randint(1, 1000)
+        x, y = draw()
+        cx, cy = x // cell, y // cell
         # Ensure nodes are not too close
         too_close = False
-        for pos in positions.values():
-            if math.hypot(x - pos[0], y - pos[1]) < 10:
-                too_close = True
+        for gx in (cx - 1, cx, cx + 1):
+            for gy in (cy - 1, cy, cy + 1):
+                for px, py in grid.get((gx, gy), ()):
+                    if math.hypot(x - px, y - py) < min_distance:
+                        too_close = True
+                        break
+                if too_close:
+                    break
+            if too_close:
                 break
         if not too_close:
             positions[len(positions)] = (x, y)
+            grid.setdefault((cx, cy), []).append((x, y))
+    return positions
+
+
+def _legacy_draws(n, edge_density):
+    """Positions, weights and edges drawn from the global `random` state, in the original order."""
+    positions = _place_points(n, lambda: (random.randint(1, 1000), random.randint(1, 1000)), 10, 1000)
+    weights = {v: random.uniform(1, 20) for v in range(n)}
+    # Sampling indices draws the same values as sampling the list of all pairs
+    m = int(edge_density * _pair_count(n))
+    edge_indices = random.sample(range(_pair_count(n)), m)
+    return positions, weights, edge_indices
+
+
+def generate_random_graph(n, edge_density, seed):
+    random.seed(seed)
+    positions, weights, edge_indices = _legacy_draws(n, edge_density)
+    G = nx.Graph()
+    # Add n nodes with random positions
     G.add_nodes_from(positions.keys())
     # Assign random weights
-    weights = {v: random.uniform(1, 20) for v in G.nodes()}
     nx.set_node_attributes(G, weights, 'weight')
     # Assign x and y coordinates as separate attributes
     x_coords = {node: pos[0] for node, pos in positions.items()}
     y_coords = {node: pos[1] for node, pos in positions.items()}
     nx.set_node_attributes(G, x_coords, 'x')
     nx.set_node_attributes(G, y_coords, 'y')
-    # Possible edges
-    possible_edges = list(itertools.combinations(G.nodes(), 2))
-    # Calculate number of edges based on density
-    m = int(edge_density * len(possible_edges))
-    # Randomly select edges
-    edges = random.sample(possible_edges, m)
-    G.add_edges_from(edges)
+    # Decode the sampled pair indices into edges
+    sources, targets = decode_pairs(edge_indices, n)
+    G.add_edges_from(zip(sources.tolist(), targets.tolist()))
     return G, weights, positions  # positions can be left as is if needed elsewhere
+
+
+def _sample_pair_indices(rng, total, m):
+    """m distinct integers from [0, total) in random order, using O(m) memory when m is small."""
+    if m > total // 2:
+        # Dense: sample the pairs to leave out instead
+        keep = np.ones(total, dtype=bool)
+        keep[_sample_pair_indices(rng, total, total - m)] = False
+        return rng.permutation(np.flatnonzero(keep))
+    chosen = np.empty(0, dtype=np.int64)
+    while len(chosen) < m:
+        draws = rng.integers(0, total, size=int((m - len(chosen)) * 1.1) + 16)
+        merged = np.concatenate((chosen, draws))
+        # Keep the first occurrence of every value so earlier picks stay in place
+        _, first = np.unique(merged, return_index=True)
+        chosen = merged[np.sort(first)]
+    return chosen[:m]
+
+
+def generate_random_csr_graph(n, edge_density, seed, compat=False, min_distance=10, size=None):
+    """
+    Generates a random graph straight into a CSRGraph, without NetworkX and
+    without listing all n(n-1)/2 vertex pairs: edge indices are sampled from
+    the pair index space and decoded to (i, j).
+
+    Returns (graph, weights, positions) with NumPy weight and (n, 2) position
+    arrays. With `compat`, the draws replay `generate_random_graph` exactly
+    (same seed, same graph); otherwise a NumPy generator is used and the
+    coordinate box grows with n (side 2 * min_distance * sqrt(n), at least
+    1000) so that the minimum distance can always be met.
+    """
+    if compat:
+        random.seed(seed)
+        positions, weights, edge_indices = _legacy_draws(n, edge_density)
+        positions = np.array([positions[v] for v in range(n)], dtype=np.int64).reshape(-1, 2)
+        weights = np.fromiter(weights.values(), dtype=np.float64, count=n)
+    else:
+        rng = np.random.default_rng(seed)
+        if size is None:
+            size = max(1000, int(2 * min_distance * math.sqrt(n)))
+        block = []
+
+        def draw():
+            if not block:
+                block.extend(map(tuple, rng.integers(1, size + 1, size=(4096, 2)).tolist()))
+            return block.pop()
+
+        positions = _place_points(n, draw, min_distance, size)
+        positions = np.array([positions[v] for v in range(n)], dtype=np.int64).reshape(-1, 2)
+        weights = rng.uniform(1, 20, size=n)
+        m = int(edge_density * _pair_count(n))
+        edge_indices = _sample_pair_indices(rng, _pair_count(n), m)
+    sources, targets = decode_pairs(edge_indices, n)
+    graph = CSRGraph.from_edges(n, sources, targets, weights)
+    return graph, weights, positions
@@ -0,0 +1,174 @@
+import time
+from contextlib import contextmanager
+
+# Functions kept from a cProfile run, by cumulative time
+PROFILE_TOP = 20
+
+# Recorder of the run in progress, if any (see `recording`)
+_active = None
+
+
+class _Phase:
+    __slots__ = ('recorder', 'name', 'start')
+
+    def __init__(self, recorder, name):
+        self.recorder = recorder
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        phases = self.recorder.phases
+        phases[self.name] = phases.get(self.name, 0) + time.perf_counter_ns() - self.start
+        return False
+
+
+class Recorder:
+    """
+    Metrics of one run: phase timers (perf_counter_ns, summed per name) and
+    named counters, plus peak memory and a profile when `recording` was
+    asked for them.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.phases = {}
+        self.counters = {}
+        self.total_ns = None
+        self.peak_memory = None
+        self.profile = None
+
+    def phase(self, name):
+        """Context manager adding the time spent inside it to phase `name`."""
+        return _Phase(self, name)
+
+    def count(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def snapshot(self):
+        """Phases and counters so far, in a form `merge` accepts."""
+        return {'phases_ns': dict(self.phases), 'counters': dict(self.counters)}
+
+    def merge(self, snapshot):
+        for name, value in snapshot['phases_ns'].items():
+            self.phases[name] = self.phases.get(name, 0) + value
+        for name, value in snapshot['counters'].items():
+            self.count(name, value)
+
+    def as_dict(self):
+        """JSON-serializable metrics, with phase times in ms."""
+        metrics = {
+            'phases_ms': {name: value / 1e6 for name, value in self.phases.items()},
+            'counters': dict(self.counters)
+        }
+        if self.total_ns is not None:
+            metrics['total_ms'] = self.total_ns / 1e6
+        if self.peak_memory is not None:
+            metrics['peak_memory_bytes'] = self.peak_memory
+        if self.profile is not None:
+            metrics['profile'] = self.profile
+        return metrics
+
+
+class _NullPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class _NullRecorder:
+    """Stand-in used when nothing is recording: every call is a no-op."""
+
+    __slots__ = ()
+    enabled = False
+    _phase = _NullPhase()
+
+    def phase(self, name):
+        return self._phase
+
+    def count(self, name, value=1):
+        pass
+
+    def merge(self, snapshot):
+        pass
+
+
+NULL_RECORDER = _NullRecorder()
+
+
+def current():
+    """The recorder of the run in progress, or a no-op one."""
+    return _active if _active is not None else NULL_RECORDER
+
+
+def _profile_rows(profiler, top):
+    import io
+    import pstats
+
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    rows = []
+    for (file_name, line, function), (_, calls, total, cumulative, _) in stats.stats.items():
+        rows.append({
+            'function': f"{file_name}:{line}({function})",
+            'calls': calls,
+            'total_ms': total * 1000,
+            'cumulative_ms': cumulative * 1000
+        })
+    rows.sort(key=lambda row: -row['cumulative_ms'])
+    return rows[:top]
+
+
+@contextmanager
+def recording(memory=False, profile=False, profile_top=PROFILE_TOP):
+    """
+    Records the metrics of the solver calls made inside the block:
+
+        with recording(memory=True) as metrics:
+            greedy_dominating_set(G)
+        metrics.as_dict()
+
+    Solvers fetch the recorder with `current()`; outside a recording they
+    get a no-op one, so instrumentation costs nothing when disabled. The
+    whole block is timed as `total_ns`. `memory` captures the peak
+    traced allocation with tracemalloc and `profile` runs cProfile, keeping
+    the `profile_top` functions by cumulative time. Both slow the run down.
+    """
+    global _active
+    recorder = Recorder()
+    previous = _active
+    _active = recorder
+    started_tracing = False
+    # tracemalloc, cProfile and pstats are slow to import, so they load on demand
+    if memory:
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            started_tracing = True
+        tracemalloc.reset_peak()
+    profiler = None
+    if profile:
+        import cProfile
+        profiler = cProfile.Profile()
+    start = time.perf_counter_ns()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield recorder
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        recorder.total_ns = time.perf_counter_ns() - start
+        if memory:
+            recorder.peak_memory = tracemalloc.get_traced_memory()[1]
+            if started_tracing:
+                tracemalloc.stop()
+        if profiler is not None:
+            recorder.profile = _profile_rows(profiler, profile_top)
+        _active = previous
@@ -1,85 +1,352 @@
-import networkx as nx
+import hashlib
+import json
+import mmap
+import numpy as np
 import random
 import os
+import tempfile
+import warnings
 
-from src.algorithms.exhaustive_search import exhaustive_search
-from src.algorithms.greedy_heuristic import greedy_dominating_set
-from src.algorithms.randomized_search import randomized_mwds
+from src.utils.csr_graph import CSRGraph
+from src.utils.instrumentation import recording
+from src.utils.result_cache import DEFAULT_DIRECTORY, ResultCache
 
-def read_graph(file_path):
+# Files up to this size are parsed in one go; larger ones stream in chunks
+BULK_PARSE_LIMIT = 64 * 1024 * 1024
+CHUNK_SIZE = 16 * 1024 * 1024
+CACHE_VERSION = 1
+# Bytes allowed in the edge lines: digits, signs, decimal points, exponents and whitespace
+NUMBER_BYTES = b"0123456789+-.eE \t\r\n"
+
+
+def _read_header(file):
+    """Reads the 4 header lines: directed flag, weighted flag, |V|, |E|."""
+    directed, weighted, num_vertices, num_edges = (int(file.readline().strip()) for _ in range(4))
+    return {
+        "directed": bool(directed),
+        "weighted": bool(weighted),
+        "num_vertices": num_vertices,
+        "num_edges": num_edges
+    }
+
+
+def _line_lengths(buffer):
+    """Number of whitespace-separated tokens on each non-blank line of `buffer`."""
+    data = np.frombuffer(buffer, dtype=np.uint8)
+    token = data > ord(' ')  # Space, tab, CR and LF all sort below the first printable byte
+    # Only token starts and line ends are indexed, never every byte
+    starts = np.flatnonzero(token[1:] > token[:-1]) + 1
+    if len(token) and token[0]:
+        starts = np.concatenate(([0], starts))
+    lines = np.searchsorted(np.flatnonzero(data == ord('\n')), starts)
+    lengths = np.bincount(lines)
+    return lengths[lengths > 0]
+
+
+def _parse_edges(buffer, weighted):
+    """
+    Parses whitespace-separated edge lines into endpoint and weight arrays,
+    dropping self-loops. Raises ValueError if a line does not hold exactly
+    2 (3 if weighted) numbers or an endpoint is not an integer.
+    """
+    columns = 3 if weighted else 2
+    invalid = bytes(buffer).translate(None, NUMBER_BYTES)
+    if invalid:
+        raise ValueError(f"Malformed edge line: unexpected character {chr(invalid[0])!r}")
+    lengths = _line_lengths(buffer)
+    if (lengths != columns).any():
+        found = int(lengths[lengths != columns][0])
+        raise ValueError(f"An edge line has {found} values instead of {columns}")
+    # Parsed in C; a token such as "1-2" or "1e" stops the parse early, which
+    # NumPy only reports with a warning, so that warning and a short count both fail
+    values = np.empty(0)
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', DeprecationWarning)
+        try:
+            if len(lengths):
+                values = np.fromstring(buffer, dtype=np.float64, sep=' ')
+        except (DeprecationWarning, ValueError):
+            values = None
+    if values is None or len(values) != lengths.sum():
+        raise ValueError("Malformed edge line: a value is not a number")
+    values = values.reshape(-1, columns)
+    endpoints = values[:, :2]
+    if not (np.isfinite(endpoints) & (endpoints == np.floor(endpoints))).all():
+        raise ValueError("Edge endpoints must be integers")
+    sources = endpoints[:, 0].astype(np.int64)
+    targets = endpoints[:, 1].astype(np.int64)
+    keep = sources != targets  # Avoid self-loops
+    edge_weights = values[keep, 2] if weighted else None
+    return sources[keep], targets[keep], edge_weights
+
+
+def _file_digest(file_path):
+    digest = hashlib.sha1()
+    with open(file_path, 'rb') as file:
+        for block in iter(lambda: file.read(CHUNK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _cache_dir(file_path):
+    return f"{file_path}.cache"
+
+
+def _temp_path(directory, suffix):
+    """A new, unique file in `directory`, so concurrent cache builders never share scratch files."""
+    handle, path = tempfile.mkstemp(dir=directory, suffix=suffix)
+    os.close(handle)
+    return path
+
+
+def _write_json(path, data):
+    """Writes `data` to a temporary file and moves it over `path` in one step."""
+    temp_path = _temp_path(os.path.dirname(path), ".json")
+    with open(temp_path, 'w') as file:
+        json.dump(data, file)
+    os.replace(temp_path, path)
+
+
+def _load_cache(file_path):
+    """Returns the cached (header, sources, targets, edge_weights) or None if stale."""
+    cache_dir = _cache_dir(file_path)
+    meta_path = os.path.join(cache_dir, "meta.json")
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path, 'r') as file:
+        meta = json.load(file)
+    stat = os.stat(file_path)
+    if meta.get("version") != CACHE_VERSION or meta["size"] != stat.st_size:
+        return None
+    if meta["mtime_ns"] != stat.st_mtime_ns:
+        # Touched but possibly unchanged: fall back to the content hash
+        if meta["sha1"] != _file_digest(file_path):
+            return None
+        meta["mtime_ns"] = stat.st_mtime_ns
+        _write_json(meta_path, meta)
+    arrays = [np.load(os.path.join(cache_dir, f"{name}.npy"), mmap_mode='r')
+              if name in meta["arrays"] else None
+              for name in ("sources", "targets", "edge_weights")]
+    return (meta["header"], *arrays)
+
+
+def _build_cache(file_path):
+    """Parses the file chunk by chunk straight into memory-mapped .npy files."""
+    cache_dir = _cache_dir(file_path)
+    os.makedirs(cache_dir, exist_ok=True)
+    stat = os.stat(file_path)
+    with open(file_path, 'rb') as file:
+        header = _read_header(file)
+        body_start = file.tell()
+        weighted = header["weighted"]
+        # The header edge count bounds the output; self-loops make it shorter
+        capacity = header["num_edges"]
+        names = ["sources", "targets"] + (["edge_weights"] if weighted else [])
+        scratch_paths = {name: _temp_path(cache_dir, ".npy") for name in names}
+        outputs = {name: np.lib.format.open_memmap(
+                       scratch_paths[name], mode='w+',
+                       dtype=np.float64 if name == "edge_weights" else np.int64,
+                       shape=(capacity,))
+                   for name in names}
+        count = 0
+        try:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                position = body_start
+                while position < len(data):
+                    end = min(position + CHUNK_SIZE, len(data))
+                    if end < len(data):
+                        end = data.rfind(b'\n', position, end) + 1 or len(data)
+                    sources, targets, edge_weights = _parse_edges(data[position:end], weighted)
+                    if count + len(sources) > capacity:
+                        raise ValueError(f"{file_path} has more edges than its header declares")
+                    outputs["sources"][count:count + len(sources)] = sources
+                    outputs["targets"][count:count + len(sources)] = targets
+                    if weighted:
+                        outputs["edge_weights"][count:count + len(sources)] = edge_weights
+                    count += len(sources)
+                    position = end
+        except BaseException:
+            # Leave no scratch files behind for a malformed file
+            outputs.clear()
+            for path in scratch_paths.values():
+                os.remove(path)
+            raise
+    for name, output in outputs.items():
+        output.flush()
+        # Rewrite with the real length (memmaps cannot shrink in place), then
+        # move it into place so a concurrent build never exposes a partial file
+        final_path = _temp_path(cache_dir, ".npy")
+        np.save(final_path, output[:count])
+        del output
+        os.replace(final_path, os.path.join(cache_dir, f"{name}.npy"))
+        os.remove(scratch_paths[name])
+    meta = {
+        "version": CACHE_VERSION,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha1": _file_digest(file_path),
+        "header": header,
+        "arrays": names
+    }
+    _write_json(os.path.join(cache_dir, "meta.json"), meta)
+    return _load_cache(file_path)
+
+
+def load_edge_arrays(file_path, use_cache=True):
+    """
+    Loads a Sedgewick & Wayne graph file as NumPy arrays and returns:
+    - The header as a dict (directed, weighted, num_vertices, num_edges).
+    - The edge sources and targets (self-loops removed).
+    - The edge weights, or None if the file is unweighted.
+
+    With `use_cache`, the arrays are stored next to the file in a
+    `<file>.cache` directory of .npy files and memory-mapped on later loads.
+    The cache is rebuilt when the file size or content hash changes. Without
+    it, small files are parsed in one pass from a memory map.
+    """
+    if use_cache:
+        cached = _load_cache(file_path)
+        if cached is not None:
+            return cached
+        return _build_cache(file_path)
+    with open(file_path, 'rb') as file:
+        header = _read_header(file)
+        body_start = file.tell()
+        if os.path.getsize(file_path) > BULK_PARSE_LIMIT:
+            raise ValueError(f"{file_path} is too large to parse without the cache")
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            sources, targets, edge_weights = _parse_edges(data[body_start:], header["weighted"])
+    return header, sources, targets, edge_weights
+
+
+def _vertex_weights(num_vertices):
+    random.seed(102620)
+    return {v: random.uniform(0.1, 10.0) for v in range(num_vertices)}  # Default random weights
+
+
+def read_graph(file_path, use_cache=False):
     """
     Reads a graph from a file in the specified format and returns:
     - A NetworkX graph object.
     - The number of vertices.
     - The number of edges.
     - A dictionary of edge weights.
+    The header's directed flag is not used: the dominating set problem is
+    solved on the underlying undirected graph, so an arc u -> v lets either
+    endpoint dominate the other.
     """
-    random.seed(102620)
+    import networkx as nx  # Only this reader needs it; parsing and the CSR path do not
+
+    header, sources, targets, _ = load_edge_arrays(file_path, use_cache)
+    num_vertices = header["num_vertices"]
+    num_edges = header["num_edges"]
 
-    with open(file_path, 'r') as file:
-        lines = file.readlines()
-     
-    num_vertices = int(lines[2].strip())
-    num_edges = int(lines[3].strip())
-    
     graph = nx.Graph()
-    
-    node_weights = {v: random.uniform(0.1, 10.0) for v in range(num_vertices)}  # Default random weights
+
+    node_weights = _vertex_weights(num_vertices)
 
     for node, weight in node_weights.items():
         graph.add_node(node, weight=weight)
 
     # Add edges
-    for line in lines[4:]:
-        if not line.strip():  # Skip empty lines
-            continue
-
-        edge_data = line.strip().split()
-        u, v = int(edge_data[0]), int(edge_data[1])
-        
-        if u != v:  # Avoid self-loops
-            graph.add_edge(u, v)
+    graph.add_edges_from(zip(sources.tolist(), targets.tolist()))
 
     return graph, num_vertices, num_edges, node_weights
 
-def process_graphs(folder_path):
+
+def read_csr_graph(file_path, use_cache=True):
+    """
+    Same as `read_graph` but returns a CSRGraph built directly from the edge
+    arrays, without going through NetworkX. Like `read_graph`, it ignores
+    the directed flag and makes every arc an undirected edge.
+    """
+    header, sources, targets, _ = load_edge_arrays(file_path, use_cache)
+    num_vertices = header["num_vertices"]
+    node_weights = _vertex_weights(num_vertices)
+    weights = np.fromiter(node_weights.values(), dtype=np.float64, count=num_vertices)
+    graph = CSRGraph.from_edges(num_vertices, sources, targets, weights)
+    return graph, num_vertices, header["num_edges"], node_weights
+
+def process_graphs(folder_path, exact_max_vertices=100, seed=102620, cache_dir=DEFAULT_DIRECTORY,
+                   record_memory=False, profile=False):
     """
     Processes each graph and applies appropriate algorithms based on graph size.
+    The exact search runs on the components left by `reduce_graph` and only
+    when none of them has more than `exact_max_vertices` vertices;
+    `seed` makes the randomized search reproducible. Solver results are
+    reused from the result cache in `cache_dir` (None disables it).
+    Each algorithm's entry gets the "Metrics" recorded while it ran (see
+    `instrumentation.recording`), including peak memory with `record_memory`
+    and a cProfile summary with `profile`.
     """
+    # Imported here so that reading a graph file does not load every solver
+    from src.algorithms.exhaustive_search import exhaustive_search
+    from src.algorithms.greedy_heuristic import greedy_dominating_set
+    from src.algorithms.lower_bound import lagrangian_lower_bound
+    from src.algorithms.randomized_search import randomized_mwds
+    from src.algorithms.reduction import reduce_graph
+
+    if cache_dir is not None:
+        run = ResultCache(cache_dir).run
+    else:
+        run = lambda solver, graph, weights=None, **params: solver(graph, weights, **params)
     results = {}
     for file_name in os.listdir(folder_path):
         if file_name.endswith(".txt") and file_name != "SWlargeG.txt":
             file_path = os.path.join(folder_path, file_name)
             print(f"Processing {file_name}...")
             
-            graph, num_vertices, num_edges, weights = read_graph(file_path)
+            # Build the array-backed graph once and share it between solvers
+            graph, num_vertices, num_edges, weights = read_csr_graph(file_path)
 
             results[file_name] = {
                 "Vertices": num_vertices,
                 "Edges": num_edges
             }
 
-            if "tiny" in file_name.lower():
-                _, best_weight, _, execution_time, num_basic_operations = exhaustive_search(graph, weights)
+            if reduce_graph(graph, weights).largest_component() <= exact_max_vertices:
+                with recording(record_memory, profile) as metrics:
+                    _, best_weight, _, execution_time, num_basic_operations = run(
+                        exhaustive_search, graph, weights, reduce=True)
                 results[file_name]["Exhaustive"] = {
                     "Best Weight": best_weight,
                     "Execution Time (ms)": execution_time,
-                    "Basic Operations": num_basic_operations
+                    "Basic Operations": num_basic_operations,
+                    "Metrics": metrics.as_dict()
                 }
 
-            _, best_weight, execution_time, num_basic_operations = greedy_dominating_set(graph, weights)
+            with recording(record_memory, profile) as metrics:
+                _, best_weight, execution_time, num_basic_operations = run(greedy_dominating_set, graph, weights)
             results[file_name]["Greedy"] = {
                 "Best Weight": best_weight,
                 "Execution Time (ms)": execution_time,
-                "Basic Operations": num_basic_operations
+                "Basic Operations": num_basic_operations,
+                "Metrics": metrics.as_dict()
             }
             
-            _, best_weight, execution_time, num_basic_operations = randomized_mwds(graph, weights, max_time=10000)
+            with recording(record_memory, profile) as metrics:
+                _, best_weight, execution_time, num_basic_operations = run(randomized_mwds, graph, weights, max_time=10000, rng=seed)
             results[file_name]["Random"] = {
                 "Best Weight": best_weight,
                 "Execution Time (ms)": execution_time,
-                "Basic Operations": num_basic_operations
+                "Basic Operations": num_basic_operations,
+                "Metrics": metrics.as_dict()
             }
+
+            if "Exhaustive" not in results[file_name]:
+                # Without the optimum, report the gap to a Lagrangian lower bound
+                upper_bound = min(results[file_name][algo]["Best Weight"] for algo in ("Greedy", "Random"))
+                with recording(record_memory, profile) as metrics:
+                    lower_bound, execution_time, iterations = run(lagrangian_lower_bound, graph, upper_bound=upper_bound)
+                results[file_name]["Lower Bound"] = {
+                    "Best Weight": lower_bound,
+                    "Execution Time (ms)": execution_time,
+                    "Basic Operations": iterations,
+                    "Metrics": metrics.as_dict()
+                }
+                for algo in ("Greedy", "Random"):
+                    best_weight = results[file_name][algo]["Best Weight"]
+                    results[file_name][algo]["Gap to Bound"] = (best_weight - lower_bound) / lower_bound
     
     return results
 
@@ -92,8 +359,10 @@ if __name__ == "__main__":
         print(f"  Vertices: {result['Vertices']}")
         print(f"  Edges: {result['Edges']}")
         for algo, algo_result in result.items():
-            if algo in {"Exhaustive", "Greedy", "Random"}:  # Filter algorithms
+            if algo in {"Exhaustive", "Greedy", "Random", "Lower Bound"}:  # Filter algorithms
                 print(f"  {algo}:")
                 print(f"    Best Weight: {algo_result['Best Weight']}")
                 print(f"    Execution Time (ms): {algo_result['Execution Time (ms)']}")
                 print(f"    Basic Operations: {algo_result['Basic Operations']}")
+                if "Gap to Bound" in algo_result:
+                    print(f"    Gap to Bound: {algo_result['Gap to Bound']:.2%}")
@@ -0,0 +1,182 @@
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import types
+
+import numpy as np
+
+from src.utils.csr_graph import as_csr
+from src.utils.instrumentation import current, recording
+
+DEFAULT_DIRECTORY = ".result_cache"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# Bump to drop every entry written by an older cache layout
+CACHE_VERSION = 2
+# Modules under this package count towards a solver's version
+SOURCE_PACKAGE = "src."
+
+
+def graph_digest(graph):
+    """sha256 of a CSRGraph's adjacency, weights and labels."""
+    digest = hashlib.sha256()
+    for array in (graph.indptr, graph.indices, graph.weights):
+        digest.update(str(array.dtype).encode())
+        digest.update(np.ascontiguousarray(array).data)
+    digest.update(repr(graph.labels).encode())
+    return digest.hexdigest()
+
+
+def _source_modules(module, seen):
+    """Collects `module` and every module of this package it refers to, recursively."""
+    if module is None or module.__name__ in seen:
+        return
+    seen[module.__name__] = module
+    for value in vars(module).values():
+        if isinstance(value, types.ModuleType):
+            name = value.__name__
+        else:
+            name = getattr(value, '__module__', None)
+        if isinstance(name, str) and name.startswith(SOURCE_PACKAGE):
+            _source_modules(sys.modules.get(name), seen)
+
+
+def solver_version(solver):
+    """
+    Hash of the source of the solver's module and of every module of this
+    package it depends on, so editing any of them invalidates its entries.
+    """
+    modules = {}
+    _source_modules(inspect.getmodule(solver), modules)
+    digest = hashlib.sha256()
+    for name in sorted(modules):
+        try:
+            source = inspect.getsource(modules[name])
+        except (OSError, TypeError):
+            source = ""
+        digest.update(name.encode())
+        digest.update(source.encode())
+    return digest.hexdigest()[:16]
+
+
+class ResultCache:
+    """
+    Persistent, content-addressed store for solver results.
+
+    An entry is keyed by the graph digest (adjacency, weights, labels), the
+    solver name, the solver version (see `solver_version`) and its keyword
+    parameters, and is pickled to `<directory>/<solver>/<key>.pkl`. Hits
+    refresh the file's mtime; once the directory grows past `max_bytes` the
+    least recently used entries are deleted. Writes are atomic, so several
+    processes may share a directory.
+
+    Cached results are returned as they were recorded, including the
+    execution time of the original run. Each entry also keeps the phases
+    and counters the solver recorded (see `instrumentation`), which are
+    replayed into the current recorder on a hit.
+    """
+
+    def __init__(self, directory=DEFAULT_DIRECTORY, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._versions = {}
+
+    def key(self, solver, graph, params):
+        """Cache key of `solver(graph, **params)`, or None when params are not hashable as JSON."""
+        try:
+            encoded_params = json.dumps(params, sort_keys=True)
+        except TypeError:
+            return None  # e.g. a numpy Generator as rng: the result is not reproducible
+        name = f"{solver.__module__}.{solver.__qualname__}"
+        if name not in self._versions:
+            self._versions[name] = solver_version(solver)
+        payload = json.dumps([CACHE_VERSION, graph_digest(graph), name,
+                              self._versions[name], encoded_params])
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _path(self, solver, key):
+        return os.path.join(self.directory, solver.__name__, key + ".pkl")
+
+    def get(self, solver, key):
+        """Returns (True, value) on a hit and (False, None) on a miss."""
+        path = self._path(solver, key)
+        try:
+            with open(path, 'rb') as file:
+                value = pickle.load(file)
+            os.utime(path)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            self.misses += 1
+            return False, None
+        self.hits += 1
+        return True, value
+
+    def put(self, solver, key, value):
+        path = self._path(solver, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        file_descriptor, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(file_descriptor, 'wb') as file:
+            pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+        self.evict()
+
+    def run(self, solver, graph, weights=None, **params):
+        """
+        Returns `solver(graph, **params)` from the cache, running and storing
+        it on a miss. `graph` may be a CSRGraph or a NetworkX graph.
+        """
+        graph = as_csr(graph, weights)
+        key = self.key(solver, graph, params)
+        if key is None:
+            return solver(graph, **params)
+        metrics = current()
+        hit, entry = self.get(solver, key)
+        if hit:
+            metrics.count('result_cache.hits')
+        else:
+            metrics.count('result_cache.misses')
+            # Record this call on its own so its metrics can be stored with it
+            with recording() as recorder:
+                value = solver(graph, **params)
+            entry = {'value': value, 'metrics': recorder.snapshot()}
+            self.put(solver, key, entry)
+        metrics.merge(entry['metrics'])
+        return entry['value']
+
+    def _entries(self):
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for file_name in files:
+                path = os.path.join(root, file_name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue  # Removed by another process
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def evict(self):
+        """Deletes least recently used entries until the cache fits in `max_bytes`."""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def invalidate(self, solver=None):
+        """Drops the entries of one solver, or of every solver when `solver` is None."""
+        path = self.directory if solver is None else os.path.join(self.directory, solver.__name__)
+        shutil.rmtree(path, ignore_errors=True)
+
+    def size(self):
+        return sum(size for _, size, _ in self._entries())
@@ -1,69 +1,175 @@
 import matplotlib.pyplot as plt
 import csv
+import os
 import networkx as nx
 import itertools
-from graph_gen import generate_random_graph
-from src.algorithms.greedy_heuristic import greedy_dominating_set
-
-def visualize_initial_graph(G, n, density):
-    plt.figure(figsize=(8, 6))
-    pos = nx.get_node_attributes(G, 'pos')
-    nx.draw_networkx(G, pos, with_labels=True)
-    plt.title(f'Initial Graph (n={n}, density={density})')
-    plt.show()
-
-def visualize_dominating_set(G, dominating_set, n, density):
-    plt.figure(figsize=(12, 8))
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+from src.utils.csr_graph import as_csr
+from src.utils.graph_gen import generate_random_csr_graph
+from src.utils.read_graph import read_csr_graph
+
+# Graphs with more vertices are downsampled to about this many and rasterized
+DOWNSAMPLE_THRESHOLD = 5000
+# Most edges drawn in one plot (a uniform sample is drawn beyond this)
+MAX_DRAWN_EDGES = 200000
+# Side of the grid used to measure vertex density when downsampling
+DENSITY_GRID = 64
+# Weights are written next to the vertices up to this many vertices
+LABEL_MAX_NODES = 50
+
+
+def _node_positions(graph, positions, seed):
+    """(n, 2) float array from an array, a {label: (x, y)} dict or, when None, a seeded random layout."""
+    n = graph.number_of_nodes()
+    if positions is None:
+        # Edge-list files carry no coordinates and force layouts do not scale
+        return np.random.default_rng(seed).random((n, 2))
+    if isinstance(positions, dict):
+        return np.array([positions[label] for label in graph.labels], dtype=np.float64).reshape(-1, 2)
+    return np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+
+
+def _downsample(positions, chosen, max_nodes, rng):
+    """
+    Keeps about `max_nodes` vertices, thinning dense areas first: vertices are
+    binned on a DENSITY_GRID x DENSITY_GRID grid and each cell keeps at most
+    `cap` of its vertices on average, with `cap` chosen by bisection. Solution
+    vertices are always kept. Returns a boolean mask.
+    """
+    low = positions.min(axis=0)
+    span = np.maximum(positions.max(axis=0) - low, 1e-12)
+    cells = np.minimum((positions - low) / span * DENSITY_GRID, DENSITY_GRID - 1).astype(np.int64)
+    cell = cells[:, 0] * DENSITY_GRID + cells[:, 1]
+    counts = np.bincount(cell, minlength=DENSITY_GRID * DENSITY_GRID)
+    occupied = counts[counts > 0]
+    low_cap, high_cap = 0.0, float(occupied.max())
+    for _ in range(40):
+        cap = (low_cap + high_cap) / 2
+        if np.minimum(occupied, cap).sum() > max_nodes:
+            high_cap = cap
+        else:
+            low_cap = cap
+    keep_probability = np.minimum(1.0, low_cap / counts[cell])
+    return (rng.random(len(positions)) < keep_probability) | chosen
+
+
+def render_graph(G, path, dominating_set=(), positions=None, title=None, weights=None,
+                 max_nodes=DOWNSAMPLE_THRESHOLD, dpi=150, seed=0):
+    """
+    Draws a graph with its dominating set (red; other vertices green) and
+    writes it to `path` through the Agg backend, so no GUI is needed. `G` is
+    a CSRGraph or a NetworkX graph and `dominating_set` an already computed
+    solution (labels of G); nothing is solved here.
+
+    Edges are drawn as one LineCollection and vertices as one scatter, both
+    from NumPy arrays. Above `max_nodes` vertices the graph is downsampled by
+    density (see `_downsample`), at most MAX_DRAWN_EDGES edges are drawn and
+    both layers are rasterized. Returns `path`.
+    """
+    graph = as_csr(G, weights)
+    n = graph.number_of_nodes()
+    rng = np.random.default_rng(seed)
+    xy = _node_positions(graph, positions, seed)
+    chosen = np.zeros(n, dtype=bool)
+    chosen[[graph.index_of(label) for label in dominating_set]] = True
+    large = n > max_nodes
+    keep = _downsample(xy, chosen, max_nodes, rng) if large else np.ones(n, dtype=bool)
+
+    sources = np.repeat(np.arange(n), np.diff(graph.indptr))
+    targets = graph.indices
+    drawn = (sources < targets) & keep[sources] & keep[targets]
+    sources, targets = sources[drawn], targets[drawn]
+    if len(sources) > MAX_DRAWN_EDGES:
+        sample = np.sort(rng.choice(len(sources), MAX_DRAWN_EDGES, replace=False))
+        sources, targets = sources[sample], targets[sample]
+    vertices = np.flatnonzero(keep)
+
+    figure = Figure(figsize=(12, 8))
+    FigureCanvasAgg(figure)
+    axes = figure.add_subplot()
+    axes.add_collection(LineCollection(np.stack((xy[sources], xy[targets]), axis=1),
+                                       colors='black', linewidths=0.4 if large else 1.0,
+                                       alpha=0.3 if large else 1.0, zorder=1, rasterized=large))
+    colors = np.where(chosen[vertices, None], (1.0, 0.0, 0.0, 1.0), (0.0, 0.5, 0.0, 1.0))
+    size = float(np.clip(2e5 / max(len(vertices), 1), 1, 1200))
+    axes.scatter(xy[vertices, 0], xy[vertices, 1], s=size, c=colors, linewidths=0, zorder=2,
+                 rasterized=large)
+    if n <= LABEL_MAX_NODES:
+        for v in range(n):
+            axes.annotate(f"{graph.weights[v]:.2f}", xy[v], ha='center', va='center', zorder=3)
+    axes.autoscale_view()
+    axes.set_axis_off()
+    if large:
+        title = f"{title or ''} ({len(vertices)} of {n} vertices shown)".strip()
+    if title:
+        axes.set_title(title)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    figure.savefig(path, dpi=dpi)
+    return path
+
+
+def _generated_positions(G):
     x_coords = nx.get_node_attributes(G, 'x')
     y_coords = nx.get_node_attributes(G, 'y')
-    # Create position dictionary
-    pos = {node: (x_coords[node], y_coords[node]) for node in G.nodes()}
-    # Define node colors
-    node_colors = [] 
-    for node in G.nodes():
-        if node in dominating_set:
-            node_colors.append('red')  # Dominating set nodes in red
-        else:
-            node_colors.append('green')  # Other nodes in light blue
-    nx.draw_networkx_nodes(G, pos, node_color=node_colors, node_size=1200)
-    nx.draw_networkx_edges(G, pos)
-
-    node_labels = {node: f"{G.nodes[node]['weight']:.2f}" for node in G.nodes()}
-    nx.draw_networkx_labels(G, pos, labels=node_labels)
-
-    plt.title(f'Minimum Weight Dominating Set Red Highlighted (n={n}, density={density})')
-    plt.show()
-
-def visualize_specific_graph(n, density, seed):
-    # Generate the graph
-    G, weights, positions = generate_random_graph(n, density, seed)
-    nx.set_node_attributes(G, weights, 'weight')
-    nx.set_node_attributes(G, positions, 'pos')
-    
-    # Visualize the initial graph
-    visualize_initial_graph(G, n, density)
-    
-    # Run greedy heuristic
-    (greedy_set, _, _, _) = greedy_dominating_set(G, weights)
-    
-    # Visualize the graph with the dominating set
-    visualize_dominating_set(G, greedy_set, n, density)
-
-def visualize_graph(n, density):
+    return {node: (x_coords[node], y_coords[node]) for node in G.nodes()}
+
+
+def visualize_initial_graph(G, n, density, path=None, positions=None):
+    if positions is None and not hasattr(G, 'indptr'):
+        positions = _generated_positions(G)
+    return render_graph(G, path or f"plots/graph_n{n}_d{density}.png", positions=positions,
+                        title=f'Initial Graph (n={n}, density={density})')
+
+
+def visualize_dominating_set(G, dominating_set, n, density, path=None, positions=None):
+    if positions is None and not hasattr(G, 'indptr'):
+        positions = _generated_positions(G)
+    return render_graph(G, path or f"plots/dominating_set_n{n}_d{density}.png", dominating_set,
+                        positions=positions,
+                        title=f'Minimum Weight Dominating Set Red Highlighted (n={n}, density={density})')
+
+
+def visualize_specific_graph(n, density, seed, dominating_set=None):
+    """
+    Plots the generated graph (the one `generate_random_graph` gives for this
+    seed) and, when an already computed `dominating_set` is passed, the graph
+    with that solution highlighted. Returns the written paths.
+    """
+    graph, _, positions = generate_random_csr_graph(n, density, seed, compat=True)
+    paths = [visualize_initial_graph(graph, n, density, positions=positions)]
+    if dominating_set is not None:
+        paths.append(visualize_dominating_set(graph, dominating_set, n, density, positions=positions))
+    return paths
+
+
+def visualize_graph_file(file_path, dominating_set=(), path=None, max_nodes=DOWNSAMPLE_THRESHOLD):
+    """Plots a Sedgewick & Wayne graph file (random layout) with an already computed solution."""
+    graph, _, _, node_weights = read_csr_graph(file_path)
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    return render_graph(graph.with_weights(node_weights), path or f"plots/{name}.png", dominating_set,
+                        title=name, max_nodes=max_nodes)
+
+
+def visualize_graph(n, density, path=None):
     G = nx.read_graphml(f"graphs/graph_n{n}_d{density}.graphml")
     # Convert node labels to integers starting from 0
     G = nx.convert_node_labels_to_integers(G, label_attribute='old_label')
-    # Access positions and weights
-    x_coords = nx.get_node_attributes(G, 'x')
-    y_coords = nx.get_node_attributes(G, 'y')
-    weights = nx.get_node_attributes(G, 'weight')
-    # Create position dictionary
-    pos = {node: (x_coords[node], y_coords[node]) for node in G.nodes()}
-    # Visualize the graph
-    nx.draw(G, pos, with_labels=True, node_size=[weights[v]*100 for v in G.nodes()])
-    plt.show()
-
-def visualize_results():
+    return render_graph(G, path or f"plots/graph_n{n}_d{density}.png", positions=_generated_positions(G),
+                        title=f'Graph (n={n}, density={density})')
+
+def _finish(show):
+    if show:
+        plt.show()
+    else:
+        plt.close()
+
+
+def visualize_results(show=True):
     results = []
     with open('experiment_results.csv', 'r') as csvfile:
         reader = csv.DictReader(csvfile)
@@ -75,9 +181,9 @@ def visualize_results():
             row['exhaustive_time'] = float(row['exhaustive_time']) if row['exhaustive_time'] != '' else None
             row['exhaustive_ops'] = int(row['exhaustive_ops']) if row['exhaustive_ops'] != '' else None
             row['exhaustive_configs'] = int(row['exhaustive_configs']) if row['exhaustive_configs'] != '' else None
-            row['greedy_weight'] = float(row['greedy_weight'])
-            row['greedy_time'] = float(row['greedy_time'])
-            row['greedy_ops'] = int(row['greedy_ops'])
+            row['greedy_weight'] = float(row['greedy_weight']) if row['greedy_weight'] != '' else None
+            row['greedy_time'] = float(row['greedy_time']) if row['greedy_time'] != '' else None
+            row['greedy_ops'] = int(row['greedy_ops']) if row['greedy_ops'] != '' else None
             row['greedy_precision'] = float(row['greedy_precision']) if row['greedy_precision'] != '' else None
             row['randomized_weight'] = float(row['randomized_weight']) if row['randomized_weight'] != '' else None
             row['randomized_time'] = float(row['randomized_time']) if row['randomized_time'] != '' else None
@@ -102,7 +208,7 @@ def visualize_results():
     plt.legend()
     plt.grid(True)
     plt.savefig('plots/execution_time_greedy_all_densities.png')
-    plt.show()
+    _finish(show)
 
     # Reset markers and colors for the next plot
     markers = itertools.cycle(('o', 'x', '^', 's', 'D', '*'))
@@ -121,7 +227,7 @@ def visualize_results():
     plt.legend()
     plt.grid(True)
     plt.savefig('plots/execution_time_exhaustive_all_densities.png')
-    plt.show()
+    _finish(show)
 
     # Reset markers and colors again
     markers = itertools.cycle(('o', 'x', '^', 's', 'D', '*'))
@@ -140,7 +246,7 @@ def visualize_results():
     plt.legend()
     plt.grid(True)
     plt.savefig('plots/basic_ops_greedy_all_densities.png')
-    plt.show()
+    _finish(show)
 
     # Reset markers and colors
     markers = itertools.cycle(('o', 'x', '^', 's', 'D', '*'))
@@ -159,7 +265,7 @@ def visualize_results():
     plt.legend()
     plt.grid(True)
     plt.savefig('plots/basic_ops_exhaustive_all_densities.png')
-    plt.show()
+    _finish(show)
 
     # Reset markers and colors
     markers = itertools.cycle(('o', 'x', '^', 's', 'D', '*'))
@@ -179,7 +285,7 @@ def visualize_results():
     plt.legend()
     plt.grid(True)
     plt.savefig('plots/precision_all_densities.png')
-    plt.show()
+    _finish(show)
 
     # Plot execution time for Randomized Algorithm
     plt.figure(figsize=(10, 6))
@@ -194,7 +300,7 @@ def visualize_results():
     plt.legend()
     plt.grid(True)
     plt.savefig('plots/execution_time_randomized_all_densities.png')
-    plt.show()
+    _finish(show)
 
     # Plot precision of Randomized Algorithm
     plt.figure(figsize=(10, 6))
@@ -210,7 +316,7 @@ def visualize_results():
     plt.legend()
     plt.grid(True)
     plt.savefig('plots/precision_randomized_all_densities.png')
-    plt.show()
+    _finish(show)
 
     # Plot number of basic operations for Randomized Algorithm
     plt.figure(figsize=(10, 6))
@@ -226,4 +332,4 @@ def visualize_results():
     plt.legend()
     plt.grid(True)
     plt.savefig('plots/basic_ops_randomized_all_densities.png')
-    plt.show()
+    _finish(show)
@@ -0,0 +1,118 @@
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import socket
+import sys
+
+# Only the standard library is imported here, so clients start fast
+
+DEFAULT_SOCKET = "/tmp/mwds_solve_server.sock"
+
+
+def graph_key(graph):
+    """
+    Key under which the server keeps a graph resident. `graph` is either
+    {'num_vertices', 'edges', 'weights'} (hashed by content) or {'file'}
+    (hashed by path, size and modification time, plus any 'weights').
+    """
+    digest = hashlib.sha256()
+    if 'file' in graph:
+        stat = os.stat(graph['file'])
+        digest.update(json.dumps(['file', graph['file'], stat.st_size, stat.st_mtime_ns,
+                                  graph.get('weights')]).encode())
+    else:
+        digest.update(json.dumps(['edges', graph['num_vertices'], graph.get('edges', []),
+                                  graph.get('weights')], separators=(',', ':')).encode())
+    return digest.hexdigest()
+
+
+class SolveClient:
+    """
+    Connection to a running `solve_server`. Graphs are sent once; later
+    requests only send their key and the graph is resent if the server has
+    evicted it.
+    """
+
+    def __init__(self, path=DEFAULT_SOCKET):
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.connect(path)
+        self._file = self._socket.makefile('rwb')
+        self._ids = itertools.count()
+        self._sent = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    def close(self):
+        self._file.close()
+        self._socket.close()
+
+    def request(self, message):
+        """Sends one JSON request and returns the server's response."""
+        message = dict(message, id=next(self._ids))
+        self._file.write(json.dumps(message).encode() + b'\n')
+        self._file.flush()
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("the solve server closed the connection")
+        return json.loads(line)
+
+    def solve(self, graph, solver='greedy', budget_ms=None, **params):
+        """
+        Solves `graph` (see `graph_key`) with one of the server's solvers
+        ('greedy', 'randomized', 'local_search', 'exact', 'portfolio').
+        `budget_ms` covers queueing and solving. Returns the response: the
+        solution (sorted vertices), its weight, 'queue_ms', 'solve_ms',
+        'latency_ms' and the solver's recorded metrics.
+        """
+        if 'file' in graph:
+            graph = dict(graph, file=os.path.abspath(graph['file']))
+        key = graph_key(graph)
+        message = {'op': 'solve', 'solver': solver, 'budget_ms': budget_ms, 'params': params}
+        response = None
+        if key in self._sent:
+            response = self.request(dict(message, graph_hash=key))
+        if response is None or response.get('error') == 'unknown_graph':
+            response = self.request(dict(message, graph=graph))
+        if not response['ok']:
+            if response['error'] == 'expired':
+                raise TimeoutError(response['message'])
+            raise RuntimeError(response['message'])
+        self._sent.add(key)
+        return response
+
+    def metrics(self):
+        """Queue depth, workers, graph cache and latency statistics of the server."""
+        return self.request({'op': 'metrics'})
+
+    def ping(self):
+        return self.request({'op': 'ping'})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sends a graph file to a running MWDS solve server.")
+    parser.add_argument('file', nargs='?', help="Sedgewick & Wayne graph file")
+    parser.add_argument('--socket', default=DEFAULT_SOCKET)
+    parser.add_argument('--solver', default='greedy')
+    parser.add_argument('--budget-ms', type=float)
+    parser.add_argument('--metrics', action='store_true', help="print the server metrics instead")
+    args = parser.parse_args(argv)
+    with SolveClient(args.socket) as client:
+        if args.metrics:
+            response = client.metrics()
+        elif args.file:
+            response = client.solve({'file': args.file}, args.solver, args.budget_ms)
+        else:
+            parser.error("a graph file or --metrics is required")
+    print(json.dumps(response, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
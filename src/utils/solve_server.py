@@ -0,0 +1,436 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src.algorithms.exhaustive_search import exhaustive_search
+from src.algorithms.greedy_heuristic import greedy_dominating_set
+from src.algorithms.local_search import local_search
+from src.algorithms.portfolio import solve
+from src.algorithms.randomized_search import randomized_mwds
+from src.utils.csr_graph import CSRGraph
+from src.utils.instrumentation import recording
+from src.utils.read_graph import read_csr_graph
+from src.utils.solve_client import DEFAULT_SOCKET, graph_key
+
+# Budget (ms) of the time-bounded solvers when a request gives none
+DEFAULT_BUDGET_MS = 1000
+# Graphs kept resident, in the server and in every worker
+GRAPH_CACHE_SIZE = 64
+# Queued requests sent to a worker in one message, when all are small
+BATCH_MAX_REQUESTS = 32
+BATCH_MAX_VERTICES = 2000
+BATCH_MAX_BUDGET_MS = 20
+# Latencies kept per solver for the percentiles of `metrics`
+LATENCY_WINDOW = 1024
+# Longest request line (graphs are sent inline)
+MAX_REQUEST_BYTES = 1 << 28
+# Seconds between checks by idle workers that the server is still alive
+PARENT_CHECK_INTERVAL = 1.0
+# `exhaustive_search` methods that accept `max_time`
+BUDGETED_EXACT_METHODS = ('branch_and_bound',)
+
+
+def _solve_greedy(graph, budget_ms, params):
+    solution, weight, _, _ = greedy_dominating_set(graph, **params)
+    return solution, weight, {}
+
+
+def _solve_randomized(graph, budget_ms, params):
+    solution, weight, _, _ = randomized_mwds(graph, max_time=budget_ms, **params)
+    return solution, weight, {}
+
+
+def _solve_local_search(graph, budget_ms, params):
+    start_time = time.time()
+    greedy_set, _, _, _ = greedy_dominating_set(graph)
+    remaining = budget_ms - (time.time() - start_time) * 1000
+    solution, weight, _, _ = local_search(graph, None, greedy_set, max(remaining, 0))
+    return solution, weight, {}
+
+
+def _solve_exact(graph, budget_ms, params):
+    method = params.get('method', 'branch_and_bound')
+    if method not in BUDGETED_EXACT_METHODS:
+        # The others cannot be stopped and would hold the worker indefinitely
+        raise ValueError(f"exact method {method!r} takes no time budget, use one of {BUDGETED_EXACT_METHODS}")
+    solution, weight, _, _, _ = exhaustive_search(graph, max_time=budget_ms, **params)
+    return solution, weight, {'optimal': True}
+
+
+def _solve_portfolio(graph, budget_ms, params):
+    solution, weight, _, optimal, _ = solve(graph, deadline_ms=budget_ms, **params)
+    return solution, weight, {'optimal': optimal}
+
+
+# name -> callable(graph, budget in ms, params) returning (set, weight, extra response fields)
+SOLVERS = {
+    'greedy': _solve_greedy,
+    'randomized': _solve_randomized,
+    'local_search': _solve_local_search,
+    'exact': _solve_exact,
+    'portfolio': _solve_portfolio
+}
+
+
+def _load_graph(payload):
+    if 'file' in payload:
+        graph, _, _, node_weights = read_csr_graph(payload['file'])
+        return graph.with_weights(payload.get('weights') or node_weights)
+    n = payload['num_vertices']
+    edges = np.asarray(payload.get('edges', []), dtype=np.int64).reshape(-1, 2)
+    if len(edges) and (edges.min() < 0 or edges.max() >= n):
+        raise ValueError(f"edge endpoints must be in [0, {n})")
+    weights = payload.get('weights') or [1.0] * n
+    return CSRGraph.from_edges(n, edges[:, 0], edges[:, 1], weights)
+
+
+def _run_job(graphs, cache_size, job):
+    """Solves one job in a worker, keeping `graphs` (key -> CSRGraph) as an LRU cache."""
+    key, payload, solver, deadline, params = job
+    started = time.time()
+    if payload is not None:
+        try:
+            graphs[key] = _load_graph(payload)
+        except Exception as error:
+            return {'ok': False, 'error': 'bad_graph', 'message': str(error), 'started': started}
+    if key not in graphs:
+        return {'ok': False, 'error': 'unknown_graph', 'message': "graph not resident", 'started': started}
+    graphs.move_to_end(key)
+    while len(graphs) > cache_size:
+        graphs.popitem(last=False)
+    graph = graphs[key]
+    budget_ms = DEFAULT_BUDGET_MS if deadline is None else (deadline - started) * 1000
+    if budget_ms <= 0:
+        return {'ok': False, 'error': 'expired', 'message': "time budget spent in the queue",
+                'started': started}
+    try:
+        with recording() as recorder:
+            solution, weight, extra = SOLVERS[solver](graph, budget_ms, params)
+    except TimeoutError as error:
+        return {'ok': False, 'error': 'expired', 'message': str(error) or "time budget exceeded",
+                'started': started}
+    except (ValueError, TypeError) as error:
+        return {'ok': False, 'error': 'bad_request', 'message': str(error), 'started': started}
+    except Exception as error:
+        # Any other failure is answered too, instead of killing the worker
+        return {'ok': False, 'error': 'solver_failed', 'message': f"{type(error).__name__}: {error}",
+                'started': started}
+    return {'ok': True, 'solution': sorted(solution), 'weight': float(weight),
+            'solve_ms': (time.time() - started) * 1000, 'num_vertices': graph.number_of_nodes(),
+            'metrics': recorder.as_dict(), 'started': started, **extra}
+
+
+def _worker_main(connection, cache_size):
+    """Worker loop: receives batches of jobs and sends back one result per job."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # The server shuts the workers down
+    parent = os.getppid()
+    graphs = OrderedDict()
+    while True:
+        # Siblings inherit this pipe, so a dead server does not always mean EOF
+        if not connection.poll(PARENT_CHECK_INTERVAL):
+            if os.getppid() != parent:
+                break
+            continue
+        try:
+            batch = connection.recv()
+        except EOFError:
+            break
+        if batch is None:
+            break
+        connection.send([_run_job(graphs, cache_size, job) for job in batch])
+
+
+class _Worker:
+    """A preforked worker process and the server's mirror of the graphs it holds."""
+
+    def __init__(self, cache_size):
+        self.connection, child = multiprocessing.Pipe()
+        # Not a daemon, so the portfolio solver may start its own processes
+        self.process = multiprocessing.Process(target=_worker_main, args=(child, cache_size))
+        self.process.start()
+        child.close()
+        self.graphs = OrderedDict()
+
+    def call(self, jobs):
+        self.connection.send(jobs)
+        return self.connection.recv()
+
+    def stop(self, timeout=5):
+        try:
+            self.connection.send(None)
+        except OSError:
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+
+
+class _Job:
+
+    def __init__(self, key, payload, solver, budget_ms, params, future):
+        self.key = key
+        self.payload = payload
+        self.solver = solver
+        self.budget_ms = budget_ms
+        self.params = params
+        self.future = future
+        self.arrival = time.time()
+        self.deadline = None if budget_ms is None else self.arrival + budget_ms / 1000
+        self.retried = False
+
+
+def _summary(values):
+    if not values:
+        return {'count': 0}
+    values = np.fromiter(values, dtype=np.float64)
+    p50, p95, p99 = np.percentile(values, (50, 95, 99), method='inverted_cdf')
+    return {'count': len(values), 'mean': float(values.mean()), 'p50': float(p50),
+            'p95': float(p95), 'p99': float(p99), 'max': float(values.max())}
+
+
+class SolveServer:
+    """
+    Long-running MWDS solve server on a Unix socket, speaking JSON lines.
+
+    Requests ({'op': 'solve' | 'metrics' | 'ping', 'id', ...}) may be
+    pipelined on one connection; responses carry the request id. Solves go
+    to `workers` preforked processes that already imported the solvers:
+    - graphs stay resident by key (see `solve_client.graph_key`) in the
+      server and in each worker, both LRU caches of `cache_size` graphs, so
+      repeated requests only send the key and jobs prefer a worker that
+      already holds their graph;
+    - small requests (greedy, or budgets up to BATCH_MAX_BUDGET_MS on graphs
+      of up to BATCH_MAX_VERTICES) waiting in the queue are sent to a worker
+      together, up to `batch_max` per message;
+    - `budget_ms` counts from arrival: what is left when a worker starts is
+      the solver's time budget, and requests that ran out in the queue fail
+      with 'expired'.
+    `metrics` reports the queue depth, busy workers, batching, graph cache
+    hits and latency percentiles per solver.
+    """
+
+    def __init__(self, path=DEFAULT_SOCKET, workers=None, cache_size=GRAPH_CACHE_SIZE,
+                 batch_max=BATCH_MAX_REQUESTS):
+        self.path = path
+        self.num_workers = workers or os.cpu_count() or 1
+        self.cache_size = cache_size
+        self.batch_max = batch_max
+        self._workers = []
+        self._idle = []
+        self._pending = deque()
+        self._graphs = OrderedDict()
+        self._sizes = {}
+        self._tasks = set()
+        self._counters = defaultdict(int)
+        self._latency = defaultdict(lambda: deque(maxlen=LATENCY_WINDOW))
+        self._queue_ms = deque(maxlen=LATENCY_WINDOW)
+
+    async def serve(self):
+        self._wakeup = asyncio.Event()
+        self._threads = ThreadPoolExecutor(max_workers=self.num_workers)
+        self._workers = [_Worker(self.cache_size) for _ in range(self.num_workers)]
+        self._idle = list(self._workers)
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        server = await asyncio.start_unix_server(self._handle, self.path, limit=MAX_REQUEST_BYTES)
+        dispatcher = asyncio.create_task(self._dispatch())
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            dispatcher.cancel()
+            for worker in self._workers:
+                worker.stop()
+            self._threads.shutdown(wait=False)
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    async def _handle(self, reader, writer):
+        lock = asyncio.Lock()
+        answers = set()
+
+        async def answer(line):
+            response = await self._respond(line)
+            async with lock:
+                writer.write(json.dumps(response).encode() + b'\n')
+                await writer.drain()
+
+        try:
+            while line := await reader.readline():
+                task = asyncio.create_task(answer(line))
+                answers.add(task)
+                task.add_done_callback(answers.discard)
+            if answers:
+                await asyncio.gather(*answers)
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    def _error(self, request_id, error, message):
+        self._counters['errors'] += 1
+        return {'id': request_id, 'ok': False, 'error': error, 'message': message}
+
+    async def _respond(self, line):
+        try:
+            message = json.loads(line)
+        except ValueError as error:
+            return self._error(None, 'bad_request', str(error))
+        request_id = message.get('id')
+        op = message.get('op', 'solve')
+        if op == 'ping':
+            return {'id': request_id, 'ok': True}
+        if op == 'metrics':
+            return {'id': request_id, 'ok': True, **self.metrics()}
+        solver = message.get('solver', 'greedy')
+        if op != 'solve' or solver not in SOLVERS:
+            return self._error(request_id, 'bad_request', f"unknown op {op!r} or solver {solver!r}")
+        self._counters['requests'] += 1
+
+        if 'graph' in message:
+            payload = message['graph']
+            try:
+                key = graph_key(payload)
+            except (OSError, KeyError, TypeError) as error:
+                return self._error(request_id, 'bad_graph', str(error))
+            self._graphs[key] = payload
+            if 'num_vertices' in payload:
+                self._sizes[key] = payload['num_vertices']
+            self._counters['graphs_loaded'] += 1
+        else:
+            key = message.get('graph_hash')
+            payload = self._graphs.get(key)
+            if payload is None:
+                # Not an error: the client resends the graph
+                self._counters['graph_misses'] += 1
+                return {'id': request_id, 'ok': False, 'error': 'unknown_graph',
+                        'message': "graph not resident, send it again"}
+            self._counters['graph_hits'] += 1
+        self._graphs.move_to_end(key)
+        while len(self._graphs) > self.cache_size:
+            evicted, _ = self._graphs.popitem(last=False)
+            self._sizes.pop(evicted, None)
+
+        job = _Job(key, payload, solver, message.get('budget_ms'), message.get('params') or {},
+                   asyncio.get_running_loop().create_future())
+        self._pending.append(job)
+        self._wakeup.set()
+        result = await job.future
+        finished = time.time()
+        started = result.pop('started', finished)
+        result.update({'id': request_id, 'graph_hash': key,
+                       'queue_ms': (started - job.arrival) * 1000,
+                       'latency_ms': (finished - job.arrival) * 1000})
+        self._queue_ms.append(result['queue_ms'])
+        if result['ok']:
+            self._latency[solver].append(result['latency_ms'])
+        else:
+            self._counters['errors'] += 1
+        return result
+
+    def _batchable(self, job):
+        small_budget = job.budget_ms is not None and job.budget_ms <= BATCH_MAX_BUDGET_MS
+        return ((job.solver == 'greedy' or small_budget)
+                and self._sizes.get(job.key, float('inf')) <= BATCH_MAX_VERTICES)
+
+    async def _dispatch(self):
+        while True:
+            while not self._pending or not self._idle:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+            first = self._pending.popleft()
+            # Prefer a worker that already holds the graph
+            worker = next((worker for worker in self._idle if first.key in worker.graphs), self._idle[0])
+            self._idle.remove(worker)
+            batch = [first]
+            if self._batchable(first):
+                while (self._pending and len(batch) < self.batch_max
+                       and self._batchable(self._pending[0])):
+                    batch.append(self._pending.popleft())
+            task = asyncio.create_task(self._run_batch(worker, batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, worker, batch):
+        jobs = []
+        for job in batch:
+            # The mirror follows the worker's LRU cache step by step
+            payload = None if job.key in worker.graphs else job.payload
+            worker.graphs[job.key] = True
+            worker.graphs.move_to_end(job.key)
+            while len(worker.graphs) > self.cache_size:
+                worker.graphs.popitem(last=False)
+            jobs.append((job.key, payload, job.solver, job.deadline, job.params))
+        self._counters['batches'] += 1
+        self._counters['batched_requests'] += len(batch)
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(self._threads, worker.call, jobs)
+        except (EOFError, OSError) as error:
+            results = [{'ok': False, 'error': 'worker_died', 'message': str(error)}] * len(batch)
+            worker.stop(timeout=0)
+            self._workers.remove(worker)
+            worker = _Worker(self.cache_size)
+            self._workers.append(worker)
+        for job, result in zip(batch, results):
+            error = None if result['ok'] else result['error']
+            if error in ('bad_graph', 'unknown_graph'):
+                worker.graphs.pop(job.key, None)
+            if error == 'unknown_graph' and not job.retried:
+                # The mirror was out of date: queue it again, with the graph this time
+                job.retried = True
+                self._pending.appendleft(job)
+                continue
+            if result['ok']:
+                self._sizes[job.key] = result.pop('num_vertices')
+            job.future.set_result(dict(result))
+        self._idle.append(worker)
+        self._wakeup.set()
+
+    def metrics(self):
+        return {
+            'queue_depth': len(self._pending),
+            'workers': len(self._workers),
+            'busy_workers': len(self._workers) - len(self._idle),
+            'requests': self._counters['requests'],
+            'errors': self._counters['errors'],
+            'batches': self._counters['batches'],
+            'batched_requests': self._counters['batched_requests'],
+            'graph_cache': {'resident': len(self._graphs), 'capacity': self.cache_size,
+                            'hits': self._counters['graph_hits'],
+                            'misses': self._counters['graph_misses'],
+                            'loaded': self._counters['graphs_loaded']},
+            'queue_ms': _summary(self._queue_ms),
+            'latency_ms': {solver: _summary(values) for solver, values in self._latency.items()}
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serves MWDS solves over a Unix socket (JSON lines).")
+    parser.add_argument('--socket', default=DEFAULT_SOCKET)
+    parser.add_argument('--workers', type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument('--cache-size', type=int, default=GRAPH_CACHE_SIZE,
+                        help="graphs kept resident per process")
+    parser.add_argument('--batch-max', type=int, default=BATCH_MAX_REQUESTS)
+    args = parser.parse_args(argv)
+    server = SolveServer(args.socket, args.workers, args.cache_size, args.batch_max)
+    print(f"Serving on {args.socket} with {server.num_workers} workers")
+    try:
+        asyncio.run(server.serve())
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
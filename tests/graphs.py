@@ -0,0 +1,18 @@
+import random
+
+import networkx as nx
+
+
+def random_weighted_graph(n, p, seed):
+    """G(n, p) with uniform weights in [0.1, 10), also set as the 'weight' node attribute."""
+    rng = random.Random(seed)
+    G = nx.gnp_random_graph(n, p, seed=seed)
+    weights = {v: rng.uniform(0.1, 10.0) for v in G}
+    nx.set_node_attributes(G, weights, 'weight')
+    return G, weights
+
+
+# (n, p, seed) cases small enough for method='enumerate', from sparse (with
+# isolated vertices) to dense
+SMALL_GRAPHS = [(n, p, seed) for seed, (n, p) in enumerate(
+    [(1, 0.5), (5, 0.0), (8, 0.2), (9, 0.35), (10, 0.5), (11, 0.15), (12, 0.3), (12, 0.7)])]
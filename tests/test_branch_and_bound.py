@@ -0,0 +1,26 @@
+import pytest
+
+from src.algorithms.branch_and_bound import branch_and_bound_search
+from src.algorithms.exhaustive_search import exhaustive_search, is_dominating_set
+from tests.graphs import SMALL_GRAPHS, random_weighted_graph
+
+
+@pytest.mark.parametrize('n, p, seed', SMALL_GRAPHS)
+def test_matches_enumeration(n, p, seed):
+    G, weights = random_weighted_graph(n, p, seed)
+    expected, expected_weight, _, _, _ = exhaustive_search(G, weights, method='enumerate')
+    solution, weight, _, _, _ = branch_and_bound_search(G, weights)
+    assert is_dominating_set(G, solution)
+    assert weight == pytest.approx(expected_weight)
+    assert sum(weights[v] for v in solution) == pytest.approx(weight)
+
+
+def test_default_method_is_branch_and_bound():
+    G, weights = random_weighted_graph(12, 0.3, 7)
+    assert exhaustive_search(G, weights)[:2] == branch_and_bound_search(G, weights)[:2]
+
+
+def test_timeout():
+    G, weights = random_weighted_graph(60, 0.1, 3)
+    with pytest.raises(TimeoutError):
+        branch_and_bound_search(G, weights, max_time=0)
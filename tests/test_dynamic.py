@@ -0,0 +1,87 @@
+import json
+import random
+
+import networkx as nx
+import pytest
+
+from src.algorithms.dynamic import DynamicDominatingSet
+from src.algorithms.exhaustive_search import exhaustive_search
+from tests.graphs import random_weighted_graph
+
+
+def _random_batch(state, rng, next_label, size):
+    """A batch of `size` random events valid for the nodes of `state`; returns it and the next free label."""
+    events = []
+    nodes = list(state.adjacency)
+    for _ in range(size):
+        kind = rng.choice(['add_edge', 'add_edge', 'remove_edge', 'set_weight', 'add_node', 'remove_node'])
+        if kind == 'add_node' or len(nodes) < 3:
+            events.append(('add_node', next_label, rng.uniform(0.1, 10.0)))
+            nodes.append(next_label)
+            next_label += 1
+        elif kind == 'remove_node':
+            events.append(('remove_node', nodes.pop(rng.randrange(len(nodes)))))
+        elif kind == 'set_weight':
+            events.append(('set_weight', rng.choice(nodes), rng.uniform(0.1, 10.0)))
+        else:
+            events.append((kind, *rng.sample(nodes, 2)))
+    return events, next_label
+
+
+def _check(state):
+    assert state.is_dominating()
+    for v in state.adjacency:
+        assert state.coverage[v] == len(state.closed_neighborhood(v) & state.solution)
+    assert state.total_weight == pytest.approx(sum(state.weights[v] for v in state.solution))
+    # Never better than the optimum of the current graph
+    optimum = exhaustive_search(state.to_csr())[1]
+    assert state.total_weight >= optimum - 1e-9
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_random_updates(seed):
+    rng = random.Random(seed)
+    G, weights = random_weighted_graph(12, 0.25, seed)
+    state = DynamicDominatingSet(G, weights)
+    _check(state)
+    next_label = G.number_of_nodes()
+    for _ in range(15):
+        events, next_label = _random_batch(state, rng, next_label, rng.randint(1, 4))
+        state.apply(events)
+        _check(state)
+    assert state.stats['batches'] == 15
+
+
+def test_round_trip():
+    G, weights = random_weighted_graph(12, 0.25, 11)
+    state = DynamicDominatingSet(G, weights)
+    state.apply([('remove_edge', *next(iter(G.edges()))), ('add_node', 12, 1.5), ('add_edge', 12, 0)])
+    restored = DynamicDominatingSet.from_dict(json.loads(json.dumps(state.to_dict())))
+    assert restored.solution == state.solution
+    assert restored.adjacency == state.adjacency
+    assert restored.total_weight == pytest.approx(state.total_weight)
+    assert restored.stats == state.stats
+
+
+def test_invalid_event():
+    G, weights = random_weighted_graph(5, 0.5, 0)
+    state = DynamicDominatingSet(G, weights)
+    with pytest.raises(ValueError):
+        state.apply([('add_edge', 0)])
+    with pytest.raises(ValueError):
+        state.apply([('add_node', 0, 1.0)])
+
+
+@pytest.mark.parametrize('bad_event', [('add_edge', 0), ('add_edge', 0, 7), ('remove_node', 1),
+                                       ('add_node', 2, 1.0), ('set_weight', 0, 'heavy'), ('merge', 0, 2)])
+def test_invalid_event_after_valid_ones(bad_event):
+    G = nx.path_graph(3)
+    state = DynamicDominatingSet(G, {0: 1.0, 1: 1.0, 2: 1.0})
+    before = (set(state.solution), {v: set(u) for v, u in state.adjacency.items()})
+    with pytest.raises(ValueError):
+        state.apply([('remove_node', 1), bad_event])
+    # Nothing of the batch was applied
+    assert (state.solution, state.adjacency) == before
+    assert state.is_dominating()
+    state.apply([('remove_node', 1), ('add_node', 3, 2.0), ('add_edge', 3, 0)])
+    assert state.is_dominating()
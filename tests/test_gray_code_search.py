@@ -0,0 +1,44 @@
+import random
+
+import networkx as nx
+import pytest
+
+from src.algorithms.exhaustive_search import exhaustive_search, is_dominating_set
+from src.algorithms.gray_code_search import MAX_VERTICES, gray_code_search
+from src.utils.csr_graph import CSRGraph
+from tests.graphs import SMALL_GRAPHS, random_weighted_graph
+
+
+@pytest.mark.parametrize('n, p, seed', SMALL_GRAPHS)
+@pytest.mark.parametrize('block_bits', [3, 16])
+def test_same_set_as_enumeration(n, p, seed, block_bits):
+    G, weights = random_weighted_graph(n, p, seed)
+    expected, expected_weight, _, _, _ = exhaustive_search(G, weights, method='enumerate')
+    solution, weight, _, _, _ = gray_code_search(G, weights, block_bits=block_bits)
+    assert solution == expected
+    assert weight == pytest.approx(expected_weight)
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_ties_broken_like_enumeration(seed):
+    # Small integer weights give many optimal sets of equal weight
+    G, weights = random_weighted_graph(10, 0.3, seed)
+    weights = {v: float(round(weight) % 3 + 1) for v, weight in weights.items()}
+    expected = exhaustive_search(G, weights, method='enumerate')[:2]
+    assert gray_code_search(G, weights, block_bits=4)[:2] == expected
+    assert exhaustive_search(G, weights, method='gray')[:2] == expected
+
+
+def test_too_many_vertices():
+    G = nx.path_graph(MAX_VERTICES + 1)
+    with pytest.raises(ValueError):
+        gray_code_search(G, {v: 1.0 for v in G})
+
+
+def test_domination_check_agrees_with_networkx():
+    rng = random.Random(0)
+    G, weights = random_weighted_graph(12, 0.25, 0)
+    graph = CSRGraph.from_networkx(G, weights)
+    for _ in range(200):
+        subset = [v for v in G if rng.random() < 0.4]
+        assert is_dominating_set(graph, subset) == is_dominating_set(G, subset)
@@ -0,0 +1,31 @@
+import json
+
+import pytest
+
+from src.algorithms.branch_and_bound import branch_and_bound_search
+from src.algorithms.exhaustive_search import exhaustive_search
+from src.algorithms.parallel_exhaustive import parallel_exhaustive_search
+from tests.graphs import SMALL_GRAPHS, random_weighted_graph
+
+
+@pytest.mark.parametrize('n, p, seed', SMALL_GRAPHS[2:])
+def test_matches_enumeration(n, p, seed):
+    G, weights = random_weighted_graph(n, p, seed)
+    expected_weight = exhaustive_search(G, weights, method='enumerate')[1]
+    solution, weight, _, _, _ = parallel_exhaustive_search(G, weights, max_workers=2, tasks_per_worker=4)
+    assert weight == pytest.approx(expected_weight)
+    assert solution == branch_and_bound_search(G, weights)[0]
+
+
+def test_resume_with_other_worker_count(tmp_path):
+    G, weights = random_weighted_graph(40, 0.12, 5)
+    path = tmp_path / 'checkpoint.json'
+    expected = parallel_exhaustive_search(G, weights, max_workers=2, checkpoint_path=str(path))
+    checkpoint = json.loads(path.read_text())
+    # Forget half of the subtrees, as if the first run had been interrupted
+    completed = checkpoint['completed']
+    checkpoint['completed'] = {index: completed[index] for index in list(completed)[::2]}
+    path.write_text(json.dumps(checkpoint))
+    resumed = parallel_exhaustive_search(G, weights, max_workers=3, checkpoint_path=str(path))
+    assert resumed[:2] == expected[:2]
+    assert json.loads(path.read_text())['num_tasks'] == checkpoint['num_tasks']
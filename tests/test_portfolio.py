@@ -0,0 +1,27 @@
+import os
+import time
+
+import pytest
+
+from src.algorithms.portfolio import solve
+from src.utils.read_graph import read_csr_graph
+
+DATA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+
+def _dominates(graph, solution):
+    chosen = {graph.index_of(v) for v in solution}
+    return all(chosen.intersection(graph.closed_neighborhood(v).tolist()) for v in graph.nodes())
+
+
+@pytest.mark.parametrize('file_name', ['SW1000EWD.txt', 'SW10000EWD.txt'])
+@pytest.mark.parametrize('deadline_ms', [50, 300, 1000])
+def test_meets_deadline(file_name, deadline_ms):
+    graph = read_csr_graph(os.path.join(DATA, file_name))[0]
+    start_time = time.time()
+    solution, weight, _, _, _ = solve(graph, deadline_ms=deadline_ms, seed=1)
+    elapsed = (time.time() - start_time) * 1000
+    # Fixed per-call costs (list and label conversions) dominate tiny deadlines
+    assert elapsed <= deadline_ms * 1.1 + 40
+    assert _dominates(graph, solution)
+    assert weight == pytest.approx(sum(graph.weights[graph.index_of(v)] for v in solution))
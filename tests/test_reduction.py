@@ -0,0 +1,35 @@
+import networkx as nx
+import pytest
+
+from src.algorithms.branch_and_bound import branch_and_bound_search
+from src.algorithms.exhaustive_search import exhaustive_search, is_dominating_set
+from src.algorithms.reduction import reduce_graph, solve_components
+from tests.graphs import SMALL_GRAPHS, random_weighted_graph
+
+
+@pytest.mark.parametrize('n, p, seed', SMALL_GRAPHS)
+@pytest.mark.parametrize('method', ['enumerate', 'branch_and_bound', 'gray'])
+def test_reduced_search_matches_enumeration(n, p, seed, method):
+    G, weights = random_weighted_graph(n, p, seed)
+    expected_weight = exhaustive_search(G, weights, method='enumerate')[1]
+    solution, weight, _, _, _ = exhaustive_search(G, weights, method=method, reduce=True)
+    assert is_dominating_set(G, solution)
+    assert weight == pytest.approx(expected_weight)
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_sparse_graphs_match_branch_and_bound(seed):
+    # Sparse enough for the leaf and dominance rules to split the graph up
+    G, weights = random_weighted_graph(40, 0.05, seed)
+    expected_weight = branch_and_bound_search(G, weights)[1]
+    solution, weight, _, _ = solve_components(G, weights, exhaustive_search, max_workers=1)
+    assert is_dominating_set(G, solution)
+    assert weight == pytest.approx(expected_weight)
+    assert reduce_graph(G, weights).largest_component() < G.number_of_nodes()
+
+
+def test_reduced_solution_in_vertex_order():
+    G = nx.relabel_nodes(nx.path_graph(13), str)
+    weights = {v: 1.0 if int(v) % 3 == 1 else 5.0 for v in G}
+    solution = exhaustive_search(G, weights, reduce=True)[0]
+    assert solution == exhaustive_search(G, weights)[0] == ('1', '4', '7', '10', '11')